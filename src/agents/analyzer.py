@@ -1,5 +1,6 @@
 import asyncio
 import time
+from functools import cached_property
 from pathlib import Path
 from typing import List, Tuple
 
@@ -13,7 +14,7 @@ from pydantic_ai.providers.openai import OpenAIProvider
 from pydantic_ai.settings import ModelSettings
 
 import config
-from utils import Logger, PromptManager, create_retrying_client
+from utils import Logger, PromptManager, get_shared_retrying_client
 
 from .tools import FileReadTool, ListFilesTool
 
@@ -105,7 +106,7 @@ class AnalyzerAgent:
         # Log results with agent names
         for agent_name, result in zip(agent_tasks.keys(), results):
             if isinstance(result, Exception):
-                Logger.error(f"Agent {agent_name} failed: {result}", exc_info=True)
+                Logger.error(f"Agent {agent_name} failed: {result}", exc_info=result)
             else:
                 Logger.info(f"Agent {agent_name} completed successfully")
 
@@ -159,15 +160,11 @@ class AnalyzerAgent:
                 },
             )
 
-            if not file_path.exists():
-                file_path.parent.mkdir(parents=True, exist_ok=True)
+            # The other analyzers are still running, so keep the file I/O off the event loop
+            await asyncio.to_thread(self._write_output, file_path, self._cleanup_output(result.output))
 
-            with open(file_path, "w") as f:
-                output = self._cleanup_output(result.output)
-                f.write(output)
-
-                Logger.info(f"{agent.name} result saved to {file_path}")
-                trace.get_current_span().set_attribute(f"{agent.name} result", result.output)
+            Logger.info(f"{agent.name} result saved to {file_path}")
+            trace.get_current_span().set_attribute(f"{agent.name} result", result.output)
 
         except UnexpectedModelBehavior as e:
             Logger.info(f"Unexpected model behavior: {e}")
@@ -176,9 +173,10 @@ class AnalyzerAgent:
             Logger.info(f"Error running agent: {e}")
             raise e
 
-    @property
+    @cached_property
     def _llm_model(self) -> Tuple[Model, ModelSettings]:
-        retrying_http_client = create_retrying_client()
+        # Built once per agent instance; the HTTP client and its connection pool are shared process-wide
+        retrying_http_client = get_shared_retrying_client()
 
         model = OpenAIModel(
             model_name=config.ANALYZER_LLM_MODEL,
@@ -198,7 +196,7 @@ class AnalyzerAgent:
 
         return model, settings
 
-    @property
+    @cached_property
     def _structure_analyzer_agent(self) -> Agent:
         model, model_settings = self._llm_model
 
@@ -216,7 +214,7 @@ class AnalyzerAgent:
             instrument=True,
         )
 
-    @property
+    @cached_property
     def _data_flow_analyzer_agent(self) -> Agent:
         model, model_settings = self._llm_model
 
@@ -234,7 +232,7 @@ class AnalyzerAgent:
             instrument=True,
         )
 
-    @property
+    @cached_property
     def _dependency_analyzer_agent(self) -> Agent:
         model, model_settings = self._llm_model
 
@@ -252,7 +250,7 @@ class AnalyzerAgent:
             instrument=True,
         )
 
-    @property
+    @cached_property
     def _request_flow_analyzer_agent(self) -> Agent:
         model, model_settings = self._llm_model
 
@@ -270,7 +268,7 @@ class AnalyzerAgent:
             instrument=True,
         )
 
-    @property
+    @cached_property
     def _api_analyzer_agent(self) -> Agent:
         model, model_settings = self._llm_model
 
@@ -296,6 +294,13 @@ class AnalyzerAgent:
 
         return self._prompt_manager.render_prompt(prompt_name, **template_vars)
 
+    def _write_output(self, file_path: Path, output: str) -> None:
+        if not file_path.exists():
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(file_path, "w") as f:
+            f.write(output)
+
     def _cleanup_output(self, output: str) -> str:
         # Cleanup absolute paths
         output = output.replace(str(self._config.repo_path), ".")
@@ -1,13 +1,20 @@
 import asyncio
-import time
+import codecs
+import hashlib
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import cached_property
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
-import re
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
 
-from opentelemetry import trace
+import ujson as json
+from httpx import Timeout
 from pydantic import BaseModel, Field
-from pydantic_ai import Agent, UnexpectedModelBehavior
+from pydantic_ai import Agent, ModelHTTPError
 from pydantic_ai.agent import AgentRunResult
 from pydantic_ai.models import Model
 from pydantic_ai.models.openai import OpenAIModel
@@ -15,13 +22,214 @@ from pydantic_ai.providers.openai import OpenAIProvider
 from pydantic_ai.settings import ModelSettings
 
 import config
-from utils import Logger, PromptManager, create_retrying_client
+from utils import Logger, PromptManager, RateLimiter, create_retrying_client, get_shared_retrying_client
 
 from .tools import FileReadTool, ListFilesTool
 
+# Folders inside an aggregate that never name an aggregate themselves
+SKIP_SUBFOLDERS = frozenset({'Commands', 'Queries', 'Handlers', 'Validators', 'DTOs'})
+
+# Prefixes of command/query action folders (e.g. CreateContractType)
+ACTION_PREFIXES = ('Create', 'Update', 'Delete', 'Get', 'Add', 'Remove', 'List')
+
+# Common non-BC folders under Application/ and Domain/Entity/
+SKIP_CONTEXT_FOLDERS = frozenset({
+    'Common', 'Shared', 'Base', 'Core', 'Extensions',
+    'Interfaces', 'Abstractions', 'Constants', 'obj', 'bin'
+})
+
+# Build output and tooling folders that never hold source worth documenting
+SKIP_WALK_FOLDERS = frozenset({'bin', 'obj', '.git', '.vs', 'node_modules', '__pycache__'})
+
+# File name markers that must appear next to the aggregate name for a layer to be worth an LLM call
+LAYER_EVIDENCE_MARKERS = {'WebUi.md': 'Controller', 'Quality.md': 'Test'}
+
+# Base classes in Domain/Entity/ that are not aggregates
+BASE_ENTITY_NAMES = frozenset({'BaseEntity', 'Entity', 'AggregateRoot', 'ValueObject'})
+
+# Namespace declaration at the top of a C# file, matched on the raw file bytes
+NAMESPACE_PATTERN = re.compile(rb'namespace\s+([A-Za-z0-9_.]+)')
+
+# Bytes searched for the namespace declaration: as many as 2048 characters can take up
+NAMESPACE_SCAN_BYTES = 2048 * 4
+
+# The two namespace segments after the first "Application" segment (e.g. Application.HR.ContractType),
+# plus the one after those for Application.<BC>.Definitions.<Aggregate>
+APPLICATION_NAMESPACE_PATTERN = re.compile(
+    r'(?:(?!Application\.)[A-Za-z0-9_]*\.)*Application\.'
+    r'(?P<context>[A-Za-z0-9_]*)\.(?P<name>[A-Za-z0-9_]*)(?:\.(?P<child>[A-Za-z0-9_]*))?'
+)
+
+# Format of the stored folder scans. Bump it whenever the discovery rules change (the SKIP_*
+# sets, ACTION_PREFIXES, name cleanup), so scans made under the old rules are discarded
+SCAN_CACHE_VERSION = 1
+
+# LLM endpoint responses that every further request would get as well (rejected API key,
+# no access to the model), so generation stops instead of falling back layer by layer
+FATAL_STATUS_CODES = frozenset({401, 403})
+
+# Lowercased names that are never aggregates
+SKIP_AGGREGATE_NAMES = frozenset({
+    'command', 'query', 'handler', 'validator', 'dto', 'model',
+    'service', 'repository', 'controller', 'common', 'base'
+})
+
+
+def _list_subdirs(path: str) -> Tuple[os.DirEntry, ...]:
+    """
+    List the immediate subdirectories of path, or nothing if it cannot be read.
+    """
+    try:
+        with os.scandir(path) as it:
+            return tuple(entry for entry in it if entry.is_dir(follow_symlinks=False))
+    except OSError:
+        return ()
+
+
+def repo_cache_dir(repo_path: Path) -> Path:
+    """
+    Cache folder of a repository inside the per-user cache, keyed by its resolved path.
+    """
+    resolved = repo_path.resolve()
+    digest = hashlib.blake2b(str(resolved).encode('utf-8'), digest_size=8).hexdigest()
+    return config.DDD_CACHE_DIR / f"{resolved.name}-{digest}"
+
+
+def _context_folder_names(path: Path) -> Optional[List[str]]:
+    """
+    Names of the candidate bounded context folders directly under path, or None
+    if path does not exist. A single directory read answers both questions; the
+    entry types come from the listing itself, so no per-entry stat is needed.
+    """
+    try:
+        with os.scandir(path) as it:
+            return [
+                entry.name for entry in it
+                if not entry.name.startswith('.')
+                and entry.name not in SKIP_CONTEXT_FOLDERS
+                and entry.is_dir()
+            ]
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def _read_head(path, max_chars: int) -> str:
+    """
+    Read at most the first max_chars characters of a UTF-8 text file.
+
+    Only as many bytes as those characters can take up are read and decoded, rather than
+    decoding the whole file and slicing it afterwards. Newlines are normalized like read_text.
+    """
+    limit = max_chars * 4  # UTF-8 uses at most four bytes per character
+    with open(path, 'rb') as f:
+        data = f.read(limit)
+    
+    # A cut-off multi-byte character at the end of a partial read is not an error
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    text = decoder.decode(data, final=len(data) < limit)
+    return text.replace('\r\n', '\n').replace('\r', '\n')[:max_chars]
+
+
+def _read_namespace(path) -> Optional[str]:
+    """
+    Namespace declared near the top of a C# file, or None. The file head is searched as
+    bytes, so only the (ASCII) namespace itself is decoded. A single unbuffered read is
+    enough for the head, so no file object is set up around it.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        head = os.read(fd, NAMESPACE_SCAN_BYTES)
+    finally:
+        os.close(fd)
+    namespace_match = NAMESPACE_PATTERN.search(head)
+    return namespace_match.group(1).decode('ascii') if namespace_match else None
+
+
+def _read_cached_response(path: Path) -> Optional[str]:
+    """
+    Response stored in a cache file, or None if there is none.
+    """
+    try:
+        return path.read_text(encoding='utf-8')
+    except OSError:
+        return None
+
+
+def _mtime_ns(path) -> Optional[int]:
+    """
+    Modification time of path in nanoseconds, or None if it does not exist.
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _walk_dirs(path: Path, mtimes: Optional[Dict[str, Optional[int]]] = None) -> Iterator[Tuple[str, List[str]]]:
+    """
+    Yield (folder name, names of its subdirectories) for every folder below path, top-down.
+    Clearing or trimming the yielded list in place prunes the walk below that folder.
+    Uses os.fwalk where available so each directory is opened relative to its parent's
+    file descriptor instead of re-resolving the full path.
+    If mtimes is given, the modification time of every listed folder (path included) is recorded in it.
+    """
+    if hasattr(os, "fwalk"):
+        for dirpath, dirnames, _, dirfd in os.fwalk(path):
+            if mtimes is not None:
+                mtimes[dirpath] = os.fstat(dirfd).st_mtime_ns
+            if dirpath != str(path):
+                yield os.path.basename(dirpath), dirnames
+    else:
+        for dirpath, dirnames, _ in os.walk(path):
+            if mtimes is not None:
+                mtimes[dirpath] = _mtime_ns(dirpath)
+            if dirpath != str(path):
+                yield os.path.basename(dirpath), dirnames
+
+
+def _index_cs_files(root: str) -> List[Tuple[str, str, FrozenSet[str]]]:
+    """
+    List the .cs files below root as (path, name without extension, names of the folders
+    between root and the file), without descending into build or VCS folders.
+    """
+    index: List[Tuple[str, str, FrozenSet[str]]] = []
+
+    def scan(path: str, folders: FrozenSet[str]) -> None:
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except OSError:
+            return
+
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in SKIP_WALK_FOLDERS:
+                    scan(entry.path, folders | {entry.name})
+            elif entry.name.endswith('.cs') and entry.is_file():
+                index.append((entry.path, entry.name[:-3], folders))
+
+    scan(root, frozenset())
+    return index
+
 
 class DDDAnalyzerAgentConfig(BaseModel):
     repo_path: Path = Field(..., description="The path to the .NET ERP repository")
+    strict_discovery: bool = Field(
+        default=False,
+        description="Always walk the Application folders, even when Definitions already lists aggregates",
+    )
+    refresh_scan_cache: bool = Field(
+        default=False,
+        description="Ignore the folder scan results cached from previous runs",
+    )
+    skip_missing_layers: bool = Field(
+        default=False,
+        description="Use placeholder content for WebUi/Quality layers when no matching controller/test file exists",
+    )
+    cache_responses: bool = Field(
+        default=False,
+        description="Reuse the stored LLM response of a layer whose prompt is unchanged since an earlier run",
+    )
 
 
 class BoundedContext(BaseModel):
@@ -41,6 +249,25 @@ class DDDAnalyzerAgent:
         self._prompt_manager = PromptManager(
             file_path=Path(__file__).parent / "prompts" / "ddd_analyzer.yaml"
         )
+        # Layer roots, resolved once instead of on every discovery call
+        self._application_path = cfg.repo_path / "Application"
+        self._domain_entity_path = cfg.repo_path / "Domain" / "Entity"
+        # (title, focus line) of each layer prompt, keyed by layer file
+        self._layer_prompt_parts: Dict[str, Tuple[str, str]] = {}
+        # Date stamp for generated documents, fixed for the whole run
+        self._today = datetime.now().strftime('%Y-%m-%d')
+        # Folder scan results of previous runs, keyed by bounded context name
+        self._cache_dir = repo_cache_dir(cfg.repo_path)
+        self._scan_cache_path = self._cache_dir / "ddd_scan.json"
+        self._scan_cache: Dict[str, dict] = {}
+        # .cs files below each layer root, shared by all aggregates' file lookups
+        self._cs_file_indexes: Dict[str, List[Tuple[str, str, FrozenSet[str]]]] = {}
+        self._cs_file_index_locks: Dict[str, threading.Lock] = {}
+        self._cs_file_index_lock = threading.Lock()
+        # LLM responses of previous runs, one file per layer prompt
+        self._response_cache_dir = self._cache_dir / "ddd_responses"
+        # Layer files that got placeholder content, keyed by (context, aggregate)
+        self._fallback_layers: Dict[Tuple[str, str], Set[str]] = {}
         
     async def analyze_ddd_structure(self) -> Dict[str, BoundedContext]:
         """
@@ -49,54 +276,78 @@ class DDDAnalyzerAgent:
         """
         Logger.info("Starting DDD structure analysis")
         
-        bounded_contexts = self._discover_bounded_contexts()
+        # The folder scans block on the filesystem, so keep them off the event loop
+        bounded_contexts, folder_aggregates = await asyncio.to_thread(self._discover_folder_structure)
         
-        # Enhance each bounded context with aggregate information
-        for bc_name, bc_info in bounded_contexts.items():
-            aggregates = await self._discover_aggregates_in_context(bc_info)
+        # Enhance each bounded context with aggregate information; contexts are independent,
+        # so their namespace passes run concurrently
+        all_aggregates = await asyncio.gather(*(
+            self._discover_aggregates_in_context(bc_info, folder_aggregates[bc_name])
+            for bc_name, bc_info in bounded_contexts.items()
+        ))
+        for bc_info, aggregates in zip(bounded_contexts.values(), all_aggregates):
             bc_info.aggregates = aggregates
             
         Logger.info(f"Discovered {len(bounded_contexts)} bounded contexts")
         return bounded_contexts
     
+    def _discover_folder_structure(self) -> Tuple[Dict[str, BoundedContext], Dict[str, Set[str]]]:
+        """
+        Discover the bounded contexts and the aggregate candidates their folders suggest.
+        """
+        bounded_contexts = self._discover_bounded_contexts()
+        
+        # Folder scans are independent per bounded context and dominated by syscalls,
+        # so overlap them in a thread pool before the per-context namespace pass
+        folder_aggregates = {}
+        if bounded_contexts:
+            self._scan_cache = self._load_scan_cache()
+            with ThreadPoolExecutor(max_workers=min(32, len(bounded_contexts))) as executor:
+                folder_aggregates = dict(
+                    zip(bounded_contexts, executor.map(self._scan_aggregate_folders, bounded_contexts.values()))
+                )
+            self._save_scan_cache()
+        
+        # The layer evidence check walks the whole repository on first use; do that here
+        # rather than on the event loop once generation has started
+        if self._config.skip_missing_layers:
+            self._prime_evidence_index()
+        
+        return bounded_contexts, folder_aggregates
+    
     def _discover_bounded_contexts(self) -> Dict[str, BoundedContext]:
         """
         Discover bounded contexts by analyzing both Application and Domain layer structures.
         Handles cases where only one layer exists.
         """
         contexts = {}
-        application_path = self._config.repo_path / "Application"
-        domain_path = self._config.repo_path / "Domain" / "Entity"
-        
-        # Skip common non-BC folders
-        skip_folders = {
-            'Common', 'Shared', 'Base', 'Core', 'Extensions', 
-            'Interfaces', 'Abstractions', 'Constants', 'obj', 'bin'
-        }
+        application_path = self._application_path
+        domain_path = self._domain_entity_path
         
         # Discover from Application layer
-        if application_path.exists():
-            for item in application_path.iterdir():
-                if item.is_dir() and not item.name.startswith('.') and item.name not in skip_folders:
-                    contexts[item.name] = BoundedContext(
-                        name=item.name,
-                        path=item
-                    )
-                    Logger.debug(f"Discovered bounded context from Application: {item.name}")
+        application_names = _context_folder_names(application_path)
+        if application_names is not None:
+            for name in application_names:
+                # Values come straight from the filesystem walk, so skip validation
+                contexts[name] = BoundedContext.model_construct(
+                    name=name,
+                    path=application_path / name
+                )
+                Logger.debug(f"Discovered bounded context from Application: {name}")
         else:
             Logger.warning("Application folder not found")
         
         # Discover from Domain/Entity layer (may have BCs not in Application)
-        if domain_path.exists():
-            for item in domain_path.iterdir():
-                if item.is_dir() and not item.name.startswith('.') and item.name not in skip_folders:
-                    if item.name not in contexts:
-                        # This BC exists in Domain but not Application
-                        contexts[item.name] = BoundedContext(
-                            name=item.name,
-                            path=self._config.repo_path / "Domain" / "Entity" / item.name
-                        )
-                        Logger.debug(f"Discovered bounded context from Domain: {item.name}")
+        domain_names = _context_folder_names(domain_path)
+        if domain_names is not None:
+            for name in domain_names:
+                if name not in contexts:
+                    # This BC exists in Domain but not Application
+                    contexts[name] = BoundedContext.model_construct(
+                        name=name,
+                        path=domain_path / name
+                    )
+                    Logger.debug(f"Discovered bounded context from Domain: {name}")
         else:
             Logger.warning("Domain/Entity folder not found")
         
@@ -105,85 +356,163 @@ class DDDAnalyzerAgent:
         
         return contexts
     
-    async def _discover_aggregates_in_context(self, context: BoundedContext) -> List[str]:
+    def _load_scan_cache(self) -> Dict[str, dict]:
         """
-        Discover aggregates within a bounded context by analyzing both Application and Domain
-        folder structures and namespace patterns.
+        Load the folder scan results stored by a previous run, if any.
+        Results stored under another SCAN_CACHE_VERSION are discarded.
+        """
+        if self._config.refresh_scan_cache:
+            return {}
+        try:
+            stored = json.loads(self._scan_cache_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            Logger.debug(f"No usable DDD scan cache at {self._scan_cache_path}: {e}")
+            return {}
+        if not isinstance(stored, dict) or stored.get("version") != SCAN_CACHE_VERSION:
+            Logger.debug(f"Discarding DDD scan cache at {self._scan_cache_path} from another version")
+            return {}
+        return stored.get("contexts", {})
+    
+    def _save_scan_cache(self) -> None:
+        """
+        Persist the folder scan results for the next run.
+        """
+        try:
+            self._scan_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            self._scan_cache_path.write_text(
+                json.dumps({"version": SCAN_CACHE_VERSION, "contexts": self._scan_cache}), encoding='utf-8'
+            )
+        except OSError as e:
+            Logger.warning(f"Could not write DDD scan cache to {self._scan_cache_path}: {e}")
+    
+    def _scan_aggregate_folders(self, context: BoundedContext) -> Set[str]:
+        """
+        Collect aggregate candidates of a bounded context, reusing the previous run's result
+        when none of the folders it was read from has changed since.
+        """
+        entry = self._scan_cache.get(context.name)
+        if (
+            entry
+            and entry.get("strict") == self._config.strict_discovery
+            and all(_mtime_ns(path) == mtime for path, mtime in entry["dirs"].items())
+        ):
+            Logger.debug(f"Reusing cached folder scan for {context.name}")
+            return set(entry["aggregates"])
+        
+        mtimes: Dict[str, Optional[int]] = {}
+        aggregates = self._scan_aggregate_folders_uncached(context, mtimes)
+        self._scan_cache[context.name] = {
+            "strict": self._config.strict_discovery,
+            "dirs": mtimes,
+            "aggregates": sorted(aggregates),
+        }
+        return aggregates
+    
+    def _scan_aggregate_folders_uncached(
+        self,
+        context: BoundedContext,
+        mtimes: Dict[str, Optional[int]]
+    ) -> Set[str]:
+        """
+        Collect aggregate candidates of a bounded context from the Application and Domain
+        folder structures. Pure filesystem work, safe to run in a worker thread.
+        Records the modification time of every folder the result depends on in mtimes.
         """
         aggregates = set()
         
         # Paths to check for aggregates
-        application_bc_path = self._config.repo_path / "Application" / context.name
-        domain_bc_path = self._config.repo_path / "Domain" / "Entity" / context.name
+        application_bc_path = self._application_path / context.name
+        domain_bc_path = self._domain_entity_path / context.name
         
         # Strategy 1: Application layer - look for Definitions, Commands, Queries folders
-        if application_bc_path.exists():
+        mtimes[str(application_bc_path)] = _mtime_ns(application_bc_path)
+        if mtimes[str(application_bc_path)] is not None:
             # Check Definitions folder
             definitions_path = application_bc_path / "Definitions"
-            if definitions_path.exists():
-                for item in definitions_path.iterdir():
-                    if item.is_dir() and not item.name.startswith('.'):
-                        aggregates.add(item.name)
+            mtimes[str(definitions_path)] = _mtime_ns(definitions_path)
+            has_definitions = mtimes[str(definitions_path)] is not None
+            if has_definitions:
+                for entry in _list_subdirs(str(definitions_path)):
+                    if not entry.name.startswith('.'):
+                        aggregates.add(entry.name)
+            
+            # Definitions is authoritative when populated; only walk the tree otherwise
+            walk_folders = self._config.strict_discovery or not (has_definitions and aggregates)
             
             # Analyze folder structure for aggregates with Commands/Queries
-            for folder in application_bc_path.rglob("*"):
-                if folder.is_dir():
-                    folder_name = folder.name
-                    
-                    # Skip command/query action folders
-                    if folder_name in ['Commands', 'Queries', 'Handlers', 'Validators', 'DTOs']:
-                        continue
-                        
-                    # Skip action-named folders
-                    action_prefixes = ['Create', 'Update', 'Delete', 'Get', 'Add', 'Remove', 'List']
-                    if any(folder_name.startswith(prefix) for prefix in action_prefixes):
-                        continue
-                    
-                    # If this folder contains Commands or Queries subfolders, it's likely an aggregate
-                    if any((folder / subfolder).exists() for subfolder in ['Commands', 'Queries']):
-                        aggregates.add(folder_name)
+            for folder_name, child_names in (_walk_dirs(application_bc_path, mtimes) if walk_folders else ()):
+                
+                # Skip command/query action folders and action-named folders, and don't
+                # descend into them: their subtrees never hold aggregates
+                if folder_name in SKIP_SUBFOLDERS or folder_name.startswith(ACTION_PREFIXES):
+                    child_names.clear()
+                    continue
+                
+                # If this folder contains Commands or Queries subfolders, it's likely an aggregate
+                if 'Commands' in child_names or 'Queries' in child_names:
+                    aggregates.add(folder_name)
         
         # Strategy 2: Domain layer - look for entity classes
-        if domain_bc_path.exists():
-            for item in domain_bc_path.iterdir():
-                if item.is_file() and item.suffix == '.cs' and not item.name.startswith('.'):
-                    # Entity file names are usually the aggregate name
-                    entity_name = item.stem
-                    # Skip common base classes
-                    if entity_name not in ['BaseEntity', 'Entity', 'AggregateRoot', 'ValueObject']:
-                        aggregates.add(entity_name)
-        
-        # Strategy 3: Analyze C# files for namespace patterns
-        cs_files = []
-        if application_bc_path.exists():
-            cs_files.extend(list(application_bc_path.rglob("*.cs")))
-        if domain_bc_path.exists():
-            cs_files.extend(list(domain_bc_path.rglob("*.cs")))
-        
-        if cs_files:
-            namespace_aggregates = await self._extract_aggregates_from_namespaces(cs_files, context.name)
-            aggregates.update(namespace_aggregates)
-        
-        # Clean up aggregate names
-        cleaned_aggregates = []
-        for agg in aggregates:
-            # Remove plural 's' if present
-            if agg.endswith('s') and len(agg) > 1:
-                agg = agg[:-1]
-            
-            # Skip obviously non-aggregate names
-            skip_names = {
-                'command', 'query', 'handler', 'validator', 'dto', 'model',
-                'service', 'repository', 'controller', 'common', 'base'
-            }
-            
-            if agg.lower() not in skip_names and len(agg) > 2:
-                cleaned_aggregates.append(agg)
+        mtimes[str(domain_bc_path)] = _mtime_ns(domain_bc_path)
+        if mtimes[str(domain_bc_path)] is not None:
+            with os.scandir(domain_bc_path) as it:
+                for entry in it:
+                    if entry.name.endswith('.cs') and not entry.name.startswith('.') and entry.is_file():
+                        # Entity file names are usually the aggregate name
+                        entity_name = entry.name[:-3]
+                        # Skip common base classes
+                        if entity_name not in BASE_ENTITY_NAMES:
+                            aggregates.add(entity_name)
+        
+        return aggregates
+    
+    async def _discover_aggregates_in_context(
+        self,
+        context: BoundedContext,
+        folder_aggregates: Optional[Set[str]] = None
+    ) -> List[str]:
+        """
+        Discover aggregates within a bounded context by analyzing both Application and Domain
+        folder structures and namespace patterns.
+        """
+        if folder_aggregates is None:
+            folder_aggregates = self._scan_aggregate_folders(context)
+        aggregates = set(folder_aggregates)
+        
+        # Strategy 3: Analyze C# files for namespace patterns. Listing and reading the files
+        # blocks, so the whole pass runs in one worker thread
+        namespace_aggregates = await asyncio.to_thread(self._scan_namespace_aggregates, context.name)
+        aggregates.update(namespace_aggregates)
+        
+        # Clean up aggregate names: remove a plural 's' if present, then skip obviously
+        # non-aggregate names
+        singular_names = {agg[:-1] if agg.endswith('s') and len(agg) > 1 else agg for agg in aggregates}
+        final_aggregates = sorted(
+            agg for agg in singular_names
+            if len(agg) > 2 and agg.lower() not in SKIP_AGGREGATE_NAMES
+        )
+        Logger.debug(f"Found {len(final_aggregates)} aggregates in {context.name}: {final_aggregates}")
+        return final_aggregates
+    
+    def _scan_namespace_aggregates(self, context_name: str) -> List[str]:
+        """
+        Extract potential aggregate names from the namespaces of a bounded context's C# files.
+        """
+        application_bc_path = self._application_path / context_name
+        domain_bc_path = self._domain_entity_path / context_name
+        
+        # The Application index is the one phase 2 uses to collect this context's files
+        cs_files = [
+            Path(path)
+            for root in (application_bc_path, domain_bc_path)
+            for path, _, _ in self._cs_file_index(root)
+        ]
         
-        Logger.debug(f"Found {len(cleaned_aggregates)} aggregates in {context.name}: {cleaned_aggregates}")
-        return sorted(list(set(cleaned_aggregates)))
+        if not cs_files:
+            return []
+        return self._extract_aggregates_from_namespaces(cs_files, context_name)
     
-    async def _extract_aggregates_from_namespaces(self, cs_files: List[Path], context_name: str) -> List[str]:
+    def _extract_aggregates_from_namespaces(self, cs_files: List[Path], context_name: str) -> List[str]:
         """
         Extract potential aggregate names from C# file namespaces.
         """
@@ -191,26 +520,17 @@ class DDDAnalyzerAgent:
         
         for cs_file in cs_files:
             try:
-                content = cs_file.read_text(encoding='utf-8', errors='ignore')[:2048]
-                
                 # Find namespace declaration
-                namespace_match = re.search(r'namespace\s+([A-Za-z0-9_.]+)', content)
-                if namespace_match:
-                    namespace = namespace_match.group(1)
-                    parts = namespace.split('.')
-                    
+                namespace = _read_namespace(cs_file)
+                if namespace:
                     # Look for patterns like Application.HR.ContractType
-                    if 'Application' in parts:
-                        app_index = parts.index('Application')
-                        if len(parts) > app_index + 2:  # Need at least Application.BC.Aggregate
-                            potential_bc = parts[app_index + 1]
-                            if potential_bc == context_name:
-                                # Next part might be aggregate or "Definitions"
-                                if len(parts) > app_index + 3 and parts[app_index + 2] == 'Definitions':
-                                    if len(parts) > app_index + 3:
-                                        aggregates.add(parts[app_index + 3])
-                                else:
-                                    aggregates.add(parts[app_index + 2])
+                    match = APPLICATION_NAMESPACE_PATTERN.match(namespace)
+                    if match and match.group('context') == context_name:
+                        # Next part might be aggregate or "Definitions"
+                        if match.group('name') == 'Definitions' and match.group('child') is not None:
+                            aggregates.add(match.group('child'))
+                        else:
+                            aggregates.add(match.group('name'))
                                     
             except Exception as e:
                 Logger.debug(f"Error reading {cs_file}: {e}")
@@ -222,56 +542,174 @@ class DDDAnalyzerAgent:
         self, 
         context_name: str, 
         aggregate_name: str,
-        template_files: Dict[str, str]
+        template_files: Dict[str, str],
+        layers: Optional[Set[str]] = None
     ) -> Dict[str, str]:
         """
         Generate documentation for a specific aggregate using AI analysis
-        and template files.
+        and template files. If layers is given, only those layer files are generated.
         """
         Logger.info(f"Generating documentation for {context_name}/{aggregate_name}")
         
-        # Collect relevant files for this aggregate
-        context_path = self._config.repo_path / "Application" / context_name
-        relevant_files = await self._collect_aggregate_files(context_path, aggregate_name)
+        # Collect relevant files for this aggregate. Every layer prompt embeds the same source
+        # files, so find and read them once, in a worker thread so other aggregates' requests
+        # keep progressing meanwhile
+        context_path = self._application_path / context_name
+        file_contents = await asyncio.to_thread(
+            lambda: self._read_relevant_files(self._collect_aggregate_files(context_path, aggregate_name))
+        )
         
-        # Generate each layer documentation
-        docs = {}
-        layer_agents = {
-            'Application.md': self._application_layer_agent,
-            'Domain.md': self._domain_layer_agent,
-            'Infrastructure.md': self._infrastructure_layer_agent,
-            'Quality.md': self._quality_layer_agent,
-            'WebUi.md': self._webui_layer_agent,
-            'ChangeLog.md': self._changelog_layer_agent
-        }
-        
-        for layer_file, agent_property in layer_agents.items():
-            try:
-                agent = agent_property
-                template_content = template_files.get(layer_file, "")
-                
-                user_prompt = self._render_layer_prompt(
-                    layer_file, context_name, aggregate_name, 
-                    relevant_files, template_content
-                )
-                
-                async with agent:
-                    result: AgentRunResult = await agent.run(
-                        user_prompt=user_prompt,
-                        output_type=str,
-                    )
-                
-                docs[layer_file] = self._cleanup_output(result.output)
-                Logger.debug(f"Generated {layer_file} for {context_name}/{aggregate_name}")
-                
-            except Exception as e:
-                Logger.error(f"Error generating {layer_file}: {e}")
-                layer_name = layer_file.replace('.md', '')
-                fallback_content = self._generate_fallback_content(layer_name, aggregate_name, context_name)
-                docs[layer_file] = fallback_content
+        # Generate each layer documentation; the layers are independent, so their
+        # LLM calls run concurrently and a failing layer only falls back on its own
+        layer_agents = self._layer_agents
+        if layers is not None:
+            layer_agents = {layer_file: agent for layer_file, agent in layer_agents.items() if layer_file in layers}
+        
+        self._fallback_layers[(context_name, aggregate_name)] = set()
+        
+        # A fatal endpoint error in one layer cancels the other layers' requests
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                tasks = {
+                    layer_file: task_group.create_task(self._generate_layer_documentation(
+                        agent, layer_file, context_name, aggregate_name,
+                        file_contents, template_files.get(layer_file, "")
+                    ))
+                    for layer_file, agent in layer_agents.items()
+                }
+        except* ModelHTTPError as group:
+            raise group.exceptions[0]
+        docs = {layer_file: task.result() for layer_file, task in tasks.items()}
         
         return docs
     
+    def fallback_layers(self, context_name: str, aggregate_name: str) -> Set[str]:
+        """
+        Layer files of the last generate_aggregate_documentation call for this aggregate
+        that hold placeholder content instead of a generated page.
+        """
+        return self._fallback_layers.get((context_name, aggregate_name), set())
+    
+    async def _generate_layer_documentation(
+        self,
+        agent: Agent,
+        layer_file: str,
+        context_name: str,
+        aggregate_name: str,
+        file_contents: Dict[str, str],
+        template_content: str
+    ) -> str:
+        """
+        Generate a single layer document, falling back to placeholder content on failure.
+        """
+        if self._config.skip_missing_layers and not self._layer_has_evidence(layer_file, aggregate_name):
+            Logger.debug(f"No source files for {layer_file} of {context_name}/{aggregate_name}, skipping LLM call")
+            return self._fallback_layer_content(layer_file, context_name, aggregate_name)
+        
+        try:
+            user_prompt = self._render_layer_prompt(
+                layer_file, context_name, aggregate_name, 
+                file_contents, template_content
+            )
+            
+            cache_file = None
+            if self._config.cache_responses:
+                cache_file = self._response_cache_file(layer_file, user_prompt)
+                cached = await asyncio.to_thread(_read_cached_response, cache_file)
+                if cached is not None:
+                    Logger.debug(f"Reusing cached {layer_file} for {context_name}/{aggregate_name}")
+                    return cached
+            
+            async with agent:
+                result: AgentRunResult = await agent.run(
+                    user_prompt=user_prompt,
+                    output_type=str,
+                )
+            
+            Logger.debug(f"Generated {layer_file} for {context_name}/{aggregate_name}")
+            content = self._cleanup_output(result.output)
+            if cache_file is not None:
+                await asyncio.to_thread(self._store_cached_response, cache_file, content)
+            return content
+            
+        except Exception as e:
+            if isinstance(e, ModelHTTPError) and e.status_code in FATAL_STATUS_CODES:
+                Logger.error(f"LLM endpoint rejected {layer_file} request with status {e.status_code}, stopping")
+                raise
+            Logger.error(f"Error generating {layer_file}: {e}")
+            return self._fallback_layer_content(layer_file, context_name, aggregate_name)
+    
+    @cached_property
+    def _prompts_fingerprint(self) -> str:
+        """
+        Hash of the prompts file, so editing a system prompt invalidates the cached responses.
+        """
+        prompts_file = Path(__file__).parent / "prompts" / "ddd_analyzer.yaml"
+        return hashlib.blake2b(prompts_file.read_bytes(), digest_size=16).hexdigest()
+    
+    def _response_cache_file(self, layer_file: str, user_prompt: str) -> Path:
+        """
+        Cache file for the response to a layer prompt, keyed by the model, the prompts
+        file and the rendered prompt (which embeds the aggregate's source files).
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (config.ANALYZER_LLM_MODEL, self._prompts_fingerprint, layer_file, user_prompt):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return self._response_cache_dir / f"{digest.hexdigest()}.md"
+    
+    def _store_cached_response(self, cache_file: Path, content: str) -> None:
+        """
+        Store a layer response for later runs. The file is written under a temporary
+        name and moved into place, so an interrupted run never leaves a truncated entry.
+        """
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+            tmp_file.write_text(content, encoding='utf-8')
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            Logger.warning(f"Could not write DDD response cache entry {cache_file}: {e}")
+    
+    @cached_property
+    def _evidence_file_names(self) -> Dict[str, Tuple[str, ...]]:
+        """
+        Names of the repository's .cs files containing each layer evidence marker, read once per analyzer.
+        """
+        names: Dict[str, List[str]] = {marker: [] for marker in LAYER_EVIDENCE_MARKERS.values()}
+        for _, dirnames, filenames in os.walk(self._config.repo_path):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_WALK_FOLDERS]
+            for file_name in filenames:
+                if file_name.endswith('.cs'):
+                    for marker, matches in names.items():
+                        if marker in file_name:
+                            matches.append(file_name)
+        return {marker: tuple(matches) for marker, matches in names.items()}
+    
+    def _prime_evidence_index(self) -> Dict[str, Tuple[str, ...]]:
+        """
+        Build the evidence file index now, so the repository walk happens on the calling
+        (worker) thread instead of inside the first _layer_has_evidence call on the event loop.
+        """
+        return self._evidence_file_names
+    
+    def _layer_has_evidence(self, layer_file: str, aggregate_name: str) -> bool:
+        """
+        Whether the repository has a source file suggesting this layer exists for the aggregate.
+        Layers without an evidence marker always count as present.
+        """
+        marker = LAYER_EVIDENCE_MARKERS.get(layer_file)
+        if marker is None:
+            return True
+        return any(aggregate_name in file_name for file_name in self._evidence_file_names[marker])
+    
+    def _fallback_layer_content(self, layer_file: str, context_name: str, aggregate_name: str) -> str:
+        """
+        Placeholder content for a layer file, recorded so fallback_layers reports it.
+        """
+        self._fallback_layers.setdefault((context_name, aggregate_name), set()).add(layer_file)
+        return self._generate_fallback_content(layer_file.replace('.md', ''), aggregate_name, context_name)
+    
     def _generate_fallback_content(self, layer_name: str, aggregate_name: str, context_name: str) -> str:
         """
         Generate meaningful fallback content when a layer cannot be analyzed.
@@ -308,76 +746,99 @@ class DDDAnalyzerAgent:
             "message": f"## No {layer_name} Layer Found\n\nThis aggregate does not have {layer_name.lower()} layer implementations in the current codebase structure."
         })
         
-        return f"# {layer_info['title']} – {aggregate_name}\n\n{layer_info['message']}\n\n---\n\n**Bounded Context**: {context_name}  \n**Aggregate**: {aggregate_name}  \n**Status**: Not implemented  \n**Last Updated**: {datetime.now().strftime('%Y-%m-%d')}\n"
+        return f"# {layer_info['title']} – {aggregate_name}\n\n{layer_info['message']}\n\n---\n\n**Bounded Context**: {context_name}  \n**Aggregate**: {aggregate_name}  \n**Status**: Not implemented  \n**Last Updated**: {self._today}\n"
     
-    async def _collect_aggregate_files(self, context_path: Path, aggregate_name: str) -> List[Path]:
+    def _cs_file_index(self, root: Path) -> List[Tuple[str, str, FrozenSet[str]]]:
         """
-        Collect all files relevant to a specific aggregate.
+        The .cs files below a layer root, walked once per analyzer. Callers run concurrently
+        in worker threads, so the first one to need a root builds its index while the others
+        wait for it; different roots are still indexed in parallel.
         """
-        relevant_files = []
-        
-        # Search patterns for aggregate-related files
-        search_patterns = [
-            f"**/*{aggregate_name}*.cs",
-            f"**/Definitions/{aggregate_name}/**/*.cs",
-            f"**/{aggregate_name}/**/*.cs",
-        ]
-        
-        for pattern in search_patterns:
-            for file_path in context_path.rglob(pattern):
-                if file_path.is_file() and file_path not in relevant_files:
-                    relevant_files.append(file_path)
-        
-        # Also look in Domain and Infrastructure folders
+        key = str(root)
+        with self._cs_file_index_lock:
+            root_lock = self._cs_file_index_locks.setdefault(key, threading.Lock())
+        with root_lock:
+            index = self._cs_file_indexes.get(key)
+            if index is None:
+                index = self._cs_file_indexes[key] = _index_cs_files(key)
+        return index
+    
+    def _collect_aggregate_files(self, context_path: Path, aggregate_name: str) -> Iterator[Path]:
+        """
+        Yield the files relevant to a specific aggregate, most relevant first. Files are
+        produced lazily, so a consumer that stops early never touches the later layer roots.
+        """
+        # Per layer root: files named after the aggregate first, then the other files
+        # below a folder named after it (including Definitions/<aggregate>)
         project_root = self._config.repo_path
-        for layer in ['Domain', 'Infrastructure']:
-            layer_path = project_root / layer
-            if layer_path.exists():
-                for pattern in search_patterns:
-                    for file_path in layer_path.rglob(pattern):
-                        if file_path.is_file() and file_path not in relevant_files:
-                            relevant_files.append(file_path)
+        for root in [context_path, project_root / 'Domain', project_root / 'Infrastructure']:
+            index = self._cs_file_index(root)
+            for path, stem, _ in index:
+                if aggregate_name in stem:
+                    yield Path(path)
+            for path, stem, folders in index:
+                if aggregate_name not in stem and aggregate_name in folders:
+                    yield Path(path)
+    
+    def _read_relevant_files(self, relevant_files: Iterable[Path]) -> Dict[str, str]:
+        """
+        Read the leading part of the aggregate's source files for the layer prompts,
+        keyed by repository-relative path.
+        """
+        file_contents = {}
+        for file_path in islice(relevant_files, 10):  # Limit to prevent token overflow
+            try:
+                content = _read_head(file_path, 2000)  # Limit content size
+                rel_path = file_path.relative_to(self._config.repo_path)
+                file_contents[str(rel_path)] = content
+            except Exception as e:
+                Logger.debug(f"Error reading {file_path}: {e}")
         
-        Logger.debug(f"Found {len(relevant_files)} files for {aggregate_name}")
-        return relevant_files
+        Logger.debug(f"Read {len(file_contents)} source files for the layer prompts")
+        return file_contents
     
     def _render_layer_prompt(
         self, 
         layer_file: str, 
         context_name: str, 
         aggregate_name: str,
-        relevant_files: List[Path],
+        file_contents: Dict[str, str],
         template_content: str
     ) -> str:
         """
         Render the prompt for generating specific layer documentation.
         """
-        file_contents = {}
-        for file_path in relevant_files[:10]:  # Limit to prevent token overflow
-            try:
-                content = file_path.read_text(encoding='utf-8')[:2000]  # Limit content size
-                rel_path = file_path.relative_to(self._config.repo_path)
-                file_contents[str(rel_path)] = content
-            except Exception as e:
-                Logger.debug(f"Error reading {file_path}: {e}")
+        # All layers share one prompt; only the title and focus line differ, and those
+        # are resolved once per layer rather than on every call
+        if layer_file not in self._layer_prompt_parts:
+            layer_key = f"agents.ddd_analyzer.layer_prompts.{layer_file.replace('.md', '').lower()}"
+            self._layer_prompt_parts[layer_file] = (
+                self._prompt_manager.render_prompt(f"{layer_key}.title"),
+                self._prompt_manager.render_prompt(f"{layer_key}.focus").strip(),
+            )
+        layer_title, layer_focus = self._layer_prompt_parts[layer_file]
         
         template_vars = {
             'repo_path': str(self._config.repo_path),
             'context_name': context_name,
             'aggregate_name': aggregate_name,
             'layer_file': layer_file,
+            'layer_title': layer_title,
+            'layer_focus': layer_focus,
             'relevant_files': file_contents,
             'template_content': template_content
         }
         
-        return self._prompt_manager.render_prompt(
-            f"agents.ddd_analyzer.layer_prompts.{layer_file.replace('.md', '').lower()}", 
-            **template_vars
-        )
+        return self._prompt_manager.render_prompt("agents.ddd_analyzer.layer_prompt", **template_vars)
     
-    @property
+    @cached_property
     def _llm_model(self) -> Tuple[Model, ModelSettings]:
-        retrying_http_client = create_retrying_client()
+        # Built once per analyzer so every layer agent shares one HTTP connection pool
+        # and, if configured, one request rate limit
+        if config.DDD_REQUESTS_PER_MINUTE > 0:
+            retrying_http_client = create_retrying_client(RateLimiter(config.DDD_REQUESTS_PER_MINUTE))
+        else:
+            retrying_http_client = get_shared_retrying_client()
 
         model = OpenAIModel(
             model_name=config.ANALYZER_LLM_MODEL,
@@ -390,24 +851,40 @@ class DDDAnalyzerAgent:
 
         settings = ModelSettings(
             temperature=config.ANALYZER_LLM_TEMPERATURE,
-            max_tokens=config.ANALYZER_LLM_MAX_TOKENS,
-            timeout=config.ANALYZER_LLM_TIMEOUT,
+            max_tokens=config.DDD_LLM_MAX_TOKENS,
+            # One deadline enforced by the HTTP client, but fail fast on unreachable endpoints
+            timeout=Timeout(config.ANALYZER_LLM_TIMEOUT, connect=10.0),
             parallel_tool_calls=config.ANALYZER_PARALLEL_TOOL_CALLS,
         )
 
         return model, settings
     
-    @property
-    def _application_layer_agent(self) -> Agent:
+    @cached_property
+    def _layer_agents(self) -> Dict[str, Agent]:
+        """
+        Layer agents keyed by the layer file they generate.
+        """
+        return {
+            'Application.md': self._application_layer_agent,
+            'Domain.md': self._domain_layer_agent,
+            'Infrastructure.md': self._infrastructure_layer_agent,
+            'Quality.md': self._quality_layer_agent,
+            'WebUi.md': self._webui_layer_agent,
+            'ChangeLog.md': self._changelog_layer_agent
+        }
+    
+    def _build_layer_agent(self, name: str, layer: str) -> Agent:
+        # Agents hold no per-run state, so each layer's agent is built once (see the
+        # cached properties below) and serves every aggregate, even concurrently
         model, model_settings = self._llm_model
         
         return Agent(
-            name="Application Layer Analyzer",
+            name=name,
             model=model,
             model_settings=model_settings,
             output_type=str,
             retries=config.ANALYZER_AGENT_RETRIES,
-            system_prompt=self._render_prompt("agents.ddd_analyzer.system_prompts.application"),
+            system_prompt=self._render_prompt(f"agents.ddd_analyzer.system_prompts.{layer}"),
             tools=[
                 FileReadTool(repo_path=self._config.repo_path).get_tool(),
                 ListFilesTool().get_tool(),
@@ -415,95 +892,29 @@ class DDDAnalyzerAgent:
             instrument=True,
         )
     
-    @property
+    @cached_property
+    def _application_layer_agent(self) -> Agent:
+        return self._build_layer_agent("Application Layer Analyzer", "application")
+    
+    @cached_property
     def _domain_layer_agent(self) -> Agent:
-        model, model_settings = self._llm_model
-        
-        return Agent(
-            name="Domain Layer Analyzer",
-            model=model,
-            model_settings=model_settings,
-            output_type=str,
-            retries=config.ANALYZER_AGENT_RETRIES,
-            system_prompt=self._render_prompt("agents.ddd_analyzer.system_prompts.domain"),
-            tools=[
-                FileReadTool(repo_path=self._config.repo_path).get_tool(),
-                ListFilesTool().get_tool(),
-            ],
-            instrument=True,
-        )
+        return self._build_layer_agent("Domain Layer Analyzer", "domain")
     
-    @property
+    @cached_property
     def _infrastructure_layer_agent(self) -> Agent:
-        model, model_settings = self._llm_model
-        
-        return Agent(
-            name="Infrastructure Layer Analyzer",
-            model=model,
-            model_settings=model_settings,
-            output_type=str,
-            retries=config.ANALYZER_AGENT_RETRIES,
-            system_prompt=self._render_prompt("agents.ddd_analyzer.system_prompts.infrastructure"),
-            tools=[
-                FileReadTool(repo_path=self._config.repo_path).get_tool(),
-                ListFilesTool().get_tool(),
-            ],
-            instrument=True,
-        )
+        return self._build_layer_agent("Infrastructure Layer Analyzer", "infrastructure")
     
-    @property
+    @cached_property
     def _quality_layer_agent(self) -> Agent:
-        model, model_settings = self._llm_model
-        
-        return Agent(
-            name="Quality Layer Analyzer",
-            model=model,
-            model_settings=model_settings,
-            output_type=str,
-            retries=config.ANALYZER_AGENT_RETRIES,
-            system_prompt=self._render_prompt("agents.ddd_analyzer.system_prompts.quality"),
-            tools=[
-                FileReadTool(repo_path=self._config.repo_path).get_tool(),
-                ListFilesTool().get_tool(),
-            ],
-            instrument=True,
-        )
+        return self._build_layer_agent("Quality Layer Analyzer", "quality")
     
-    @property
+    @cached_property
     def _webui_layer_agent(self) -> Agent:
-        model, model_settings = self._llm_model
-        
-        return Agent(
-            name="WebUI Layer Analyzer",
-            model=model,
-            model_settings=model_settings,
-            output_type=str,
-            retries=config.ANALYZER_AGENT_RETRIES,
-            system_prompt=self._render_prompt("agents.ddd_analyzer.system_prompts.webui"),
-            tools=[
-                FileReadTool(repo_path=self._config.repo_path).get_tool(),
-                ListFilesTool().get_tool(),
-            ],
-            instrument=True,
-        )
+        return self._build_layer_agent("WebUI Layer Analyzer", "webui")
     
-    @property
+    @cached_property
     def _changelog_layer_agent(self) -> Agent:
-        model, model_settings = self._llm_model
-        
-        return Agent(
-            name="ChangeLog Layer Analyzer",
-            model=model,
-            model_settings=model_settings,
-            output_type=str,
-            retries=config.ANALYZER_AGENT_RETRIES,
-            system_prompt=self._render_prompt("agents.ddd_analyzer.system_prompts.changelog"),
-            tools=[
-                FileReadTool(repo_path=self._config.repo_path).get_tool(),
-                ListFilesTool().get_tool(),
-            ],
-            instrument=True,
-        )
+        return self._build_layer_agent("ChangeLog Layer Analyzer", "changelog")
     
     def _render_prompt(self, prompt_name: str, **kwargs) -> str:
         template_vars = {
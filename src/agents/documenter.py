@@ -1,5 +1,6 @@
 import os
 import time
+from functools import cached_property
 from pathlib import Path
 from typing import Tuple
 
@@ -13,7 +14,7 @@ from pydantic_ai.providers.openai import OpenAIProvider
 from pydantic_ai.settings import ModelSettings
 
 import config
-from utils import Logger, PromptManager, create_retrying_client
+from utils import Logger, PromptManager, get_shared_retrying_client
 from utils.custom_models.gemini_provider import CustomGeminiGLA
 
 from .tools import FileReadTool
@@ -123,9 +124,10 @@ class DocumenterAgent:
         except Exception as e:
             Logger.info(f"Error running agent: {e}")
 
-    @property
+    @cached_property
     def _llm_model(self) -> Tuple[Model, ModelSettings]:
-        retrying_http_client = create_retrying_client()
+        # Built once per agent instance; the HTTP client and its connection pool are shared process-wide
+        retrying_http_client = get_shared_retrying_client()
 
         model_name = config.DOCUMENTER_LLM_MODEL
         base_url = config.DOCUMENTER_LLM_BASE_URL
@@ -159,7 +161,7 @@ class DocumenterAgent:
 
         return model, settings
 
-    @property
+    @cached_property
     def _documenter_agent(self) -> Agent:
         model, model_settings = self._llm_model
 
@@ -183,6 +185,11 @@ class DocumenterAgent:
 
     def _render_prompt(self, prompt_name: str) -> str:
         # Render the template with the config
+        return self._prompt_manager.render_prompt(prompt_name, **self._template_vars)
+
+    @cached_property
+    def _template_vars(self) -> dict:
+        # Shared by the system and user prompt renders, so the docs folder is listed once
         available_ai_docs = []
 
         ai_docs_dir = self._config.repo_path / ".ai" / "docs"
@@ -199,4 +206,4 @@ class DocumenterAgent:
             **self._config.readme.model_dump(),
         }
 
-        return self._prompt_manager.render_prompt(prompt_name, **template_vars)
+        return template_vars
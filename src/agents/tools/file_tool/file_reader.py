@@ -1,4 +1,8 @@
+import glob
 import os
+from functools import lru_cache
+from itertools import islice
+from typing import List, Optional, Tuple
 
 from opentelemetry import trace
 from pydantic_ai import ModelRetry, Tool
@@ -7,6 +11,26 @@ import config
 from utils import Logger
 
 
+@lru_cache(maxsize=256)
+def _read_lines(path: str, mtime_ns: int, line_number: int, line_count: int) -> str:
+    """Read a range of lines from a file, formatted as the tool output.
+
+    Cached per process: the layer agents of an aggregate typically read the same source files,
+    and every tool instance shares this cache.
+    """
+    with open(path, "r") as file:
+        # Only the requested lines are kept; the others are just counted for the header
+        skipped_lines = sum(1 for _ in islice(file, max(line_number, 0)))
+        lines = list(islice(file, line_count)) if line_count > 0 else file.readlines()
+        total_lines = skipped_lines + len(lines) + sum(1 for _ in file)
+
+    return (
+        f"File Line:{line_number} to {line_number + line_count} from: {total_lines}\n--- start---\n"
+        + "".join(lines)
+        + "\n--- end ---\n"
+    )
+
+
 class FileReadTool:
     def __init__(self, repo_path=None):
         self.repo_path = repo_path
@@ -14,6 +38,46 @@ class FileReadTool:
     def get_tool(self):
         return Tool(self._run, name="Read-File", takes_ctx=False, max_retries=config.TOOL_FILE_READER_MAX_RETRIES)
 
+    def _resolve_path(self, file_path: str) -> Tuple[Optional[str], List[str]]:
+        """Find the file an agent refers to, trying the likely locations in order.
+
+        Args:
+            file_path (str): The path as given by the agent.
+
+        Returns:
+            Tuple[Optional[str], List[str]]: The first existing location (None if there is none)
+                and the locations tried before it.
+        """
+        # The path as-is, as absolute path and relative to the working directory (often the same
+        # location, which is then only checked once), then relative to the repository
+        candidates = [file_path, os.path.abspath(file_path), os.path.join(os.getcwd(), file_path)]
+        patterns = []
+        if self.repo_path and not os.path.isabs(file_path):
+            repo_path = str(self.repo_path)
+            candidates.append(os.path.join(repo_path, file_path))
+
+            # Try common .NET locations if the file looks like a class name
+            if '.' not in file_path and not file_path.endswith('.cs'):
+                for folder in ("Application", "Domain", "Infrastructure"):
+                    candidates.append(os.path.join(repo_path, folder, f"{file_path}.cs"))
+                for folder in ("Application", "Domain"):
+                    patterns.append(os.path.join(repo_path, folder, "*", f"{file_path}.cs"))
+
+        tried_paths = []
+        for candidate in dict.fromkeys(candidates):
+            if os.path.exists(candidate):
+                return candidate, tried_paths
+            tried_paths.append(candidate)
+
+        # Directory listings are the most expensive lookups, so they come last
+        for pattern in patterns:
+            matches = glob.glob(pattern)
+            if matches:
+                return matches[0], tried_paths  # Take first match
+            tried_paths.append(pattern)
+
+        return None, tried_paths
+
     def _run(self, file_path: str, line_number: int = 0, line_count: int = 200) -> str:
         """Read a file and return its contents.
 
@@ -40,65 +104,7 @@ class FileReadTool:
             pass
 
         # Handle both absolute and relative paths - try multiple resolution strategies
-        tried_paths = []
-        resolved_path = None
-        
-        # Strategy 1: Try original path as-is
-        if os.path.exists(file_path):
-            resolved_path = file_path
-        else:
-            tried_paths.append(file_path)
-            
-            # Strategy 2: Try as absolute path
-            abs_path = os.path.abspath(file_path)
-            if os.path.exists(abs_path):
-                resolved_path = abs_path
-            else:
-                tried_paths.append(abs_path)
-                
-                # Strategy 3: Try relative to current working directory
-                cwd_path = os.path.join(os.getcwd(), file_path)
-                if os.path.exists(cwd_path):
-                    resolved_path = cwd_path
-                else:
-                    tried_paths.append(cwd_path)
-                    
-                    # Strategy 4: Try relative to repo_path if available
-                    if self.repo_path and not os.path.isabs(file_path):
-                        repo_relative_path = os.path.join(str(self.repo_path), file_path)
-                        if os.path.exists(repo_relative_path):
-                            resolved_path = repo_relative_path
-                        else:
-                            tried_paths.append(repo_relative_path)
-                            
-                            # Strategy 5: Try common .NET patterns if file looks like a class name
-                            if '.' not in file_path and not file_path.endswith('.cs'):
-                                # Try as .cs file in various common locations
-                                common_patterns = [
-                                    f"Application/{file_path}.cs",
-                                    f"Domain/{file_path}.cs", 
-                                    f"Infrastructure/{file_path}.cs",
-                                    f"Application/*/{file_path}.cs",
-                                    f"Domain/*/{file_path}.cs"
-                                ]
-                                
-                                for pattern in common_patterns:
-                                    if '*' in pattern:
-                                        # Handle wildcard patterns
-                                        import glob
-                                        matches = glob.glob(os.path.join(str(self.repo_path), pattern))
-                                        if matches:
-                                            resolved_path = matches[0]  # Take first match
-                                            break
-                                        else:
-                                            tried_paths.append(os.path.join(str(self.repo_path), pattern))
-                                    else:
-                                        pattern_path = os.path.join(str(self.repo_path), pattern)
-                                        if os.path.exists(pattern_path):
-                                            resolved_path = pattern_path
-                                            break
-                                        else:
-                                            tried_paths.append(pattern_path)
+        resolved_path, tried_paths = self._resolve_path(file_path)
         
         if resolved_path is None:
             try:
@@ -110,23 +116,11 @@ class FileReadTool:
             return f"File not found: {file_path}\n\nThis file may not exist in the current project structure. Consider:\n- Checking if the file exists with a different name\n- Looking for similar files in the same directory\n- Using List-Files tool to explore available files\n\nTried paths:\n" + "\n".join(f"- {path}" for path in tried_paths[:3])
 
         try:
-            with open(resolved_path, "r") as file:
-                lines = file.readlines()
-                total_lines = len(lines)
-
-                if line_number > 0:
-                    lines = lines[line_number:]
-                if line_count > 0:
-                    lines = lines[:line_count]
-
-                output = (
-                    f"File Line:{line_number} to {line_number + line_count} from: {total_lines}\n--- start---\n"
-                    + "".join(lines)
-                    + "\n--- end ---\n"
-                )
-                trace.get_current_span().set_attribute("output", output)
-
-                return output
+            # Keyed by modification time so a file changed on disk is read again
+            output = _read_lines(resolved_path, os.stat(resolved_path).st_mtime_ns, line_number, line_count)
+            trace.get_current_span().set_attribute("output", output)
+
+            return output
         except PermissionError:
             try:
                 Logger.error(f"Permission denied reading file: {file_path} -> {resolved_path}")
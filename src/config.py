@@ -37,6 +37,12 @@ ANALYZER_LLM_TEMPERATURE = float(os.getenv("ANALYZER_LLM_TEMPERATURE", "0.0"))
 
 # DDD Documentation Generator
 DDD_MAX_CONCURRENT = int(os.getenv("DDD_MAX_CONCURRENT", "5"))
+DDD_LLM_MAX_TOKENS = int(os.getenv("DDD_LLM_MAX_TOKENS", "4096"))
+DDD_REQUESTS_PER_MINUTE = int(os.getenv("DDD_REQUESTS_PER_MINUTE", "0"))
+# Per-user folder for the DDD scan and response caches, so they stay out of the analyzed repositories
+DDD_CACHE_DIR = Path(
+    os.getenv("DDD_CACHE_DIR") or Path(os.getenv("XDG_CACHE_HOME") or "~/.cache") / "ai-doc-gen"
+).expanduser()
 
 # Documenter
 DOCUMENTER_LLM_MODEL = os.environ["DOCUMENTER_LLM_MODEL"]
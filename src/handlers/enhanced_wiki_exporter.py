@@ -1,20 +1,239 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 import asyncio
+import os
+import re
+import sys
 import time
 
+import ujson as json
 from pydantic import Field
+from pydantic_ai import ModelHTTPError
 
 import config
 from utils import Logger
 from .base_handler import BaseHandler, BaseHandlerConfig
-from agents.ddd_analyzer_agent import DDDAnalyzerAgent, DDDAnalyzerAgentConfig
+from agents.ddd_analyzer_agent import DDDAnalyzerAgent, DDDAnalyzerAgentConfig, repo_cache_dir
+
+
+# Sample names used in the template files, swapped for the real ones in fallback documents
+TEMPLATE_SAMPLE_NAMES = re.compile(r"ContractType|HR|Hr")
+
+# Fallback documents used when AI generation fails, rendered with str.format_map
+FALLBACK_TEMPLATES: Dict[str, str] = {
+    "Application.md": """# Application Layer – {aggregate_name}
+
+## Commands
+
+### Create{aggregate_name}Command
+- **Purpose**: Creates a new {aggregate_lower}.
+- **Validation**: Validates input parameters.
+- **Handler**: Handles the creation logic.
+
+### Update{aggregate_name}Command
+- **Purpose**: Updates an existing {aggregate_lower}.
+- **Validation**: Validates input parameters and existence.
+- **Handler**: Handles the update logic.
+
+### Delete{aggregate_name}Command
+- **Purpose**: Deletes an existing {aggregate_lower}.
+- **Validation**: Validates existence and constraints.
+- **Handler**: Handles the deletion logic.
+
+## Queries
+
+### Get{aggregate_name}Query
+- **Purpose**: Retrieves {aggregate_lower} information.
+- **Handler**: Handles the query logic.
+- **Return Type**: {aggregate_name}Dto
+""",
+
+    "Domain.md": """# Domain Model – {aggregate_name}
+
+The **{aggregate_name}** entity represents {aggregate_lower} in the {bc_name} bounded context.
+
+### Table And Schema
+```csharp
+[Table("{aggregate_name}s", Schema = "{bc_name}")]
+```
+
+### Entity Definition:
+```csharp
+public class {aggregate_name}
+{{
+    public int {aggregate_name}Id {{ get; set; }}
+    // Additional properties would be defined here
+}}
+```
+
+### RELATIONS
+```csharp
+// Related entities would be listed here
+```
+""",
+
+    "Infrastructure.md": """# Infrastructure: {aggregate_name} Configuration
+
+**Namespace:** `Infrastructure.Persistence.Configurations.{bc_name}`  
+**File:** `{aggregate_name}Configuration.cs`  
+**Database Table:** `[{bc_name}].[{aggregate_name}s]`  
+**Entity:** `Domain.Entity.{bc_name}.{aggregate_name}`  
+
+---
+
+| Property | Configuration | Notes |
+|-----------|----------------|-------|
+| `{aggregate_name}Id` | `HasKey()` | Defines the primary key. |
+
+## Repository Implementation
+- **Interface**: I{aggregate_name}Repository
+- **Implementation**: {aggregate_name}Repository
+""",
+
+    "Quality.md": """# Quality & Testing – {aggregate_name}
+
+### Unit Tests
+- **Create{aggregate_name}Command**: Validates input and creation logic.
+- **Update{aggregate_name}Command**: Validates update logic and constraints.
+- **Delete{aggregate_name}Command**: Validates deletion logic and references.
+
+### Performance Tests
+- Verify list queries perform optimally when paging large datasets.
+
+### Observability
+- Log every failure in command validation and database exceptions.
+
+For detailed test cases, see the **Test Cases** section.
+""",
+
+    "WebUi.md": """# {aggregate_name}Controller
+
+**Namespace:** `WebUi.Areas.{bc_name}.Controllers`  
+**Inherits:** `{bc_name}BaseController`  
+**Purpose:** Manage CRUD operations for {bc_name} {aggregate_name} using MediatR.
+
+---
+
+## Create {aggregate_name}
+
+**Method:** `POST`  
+**Route:** `/{aggregate_name}/{aggregate_name}_Create`
+
+Creates a new {aggregate_lower}.
+
+## Update {aggregate_name}
+
+**Method:** `PUT`  
+**Route:** `/{aggregate_name}/{aggregate_name}_Edit/{{id}}`
+
+Updates an existing {aggregate_lower}.
+
+## List {aggregate_name}
+
+**Method:** `GET`  
+**Route:** `/{aggregate_name}/{aggregate_name}_List`
+
+Retrieves a list of {aggregate_lower}s.
+""",
+
+    "ChangeLog.md": """# Change History – {aggregate_name}
+
+## Latest Version
+- **Version**: 1.0.0
+- **Date**: {date}
+- **Changes**:
+  * Initial implementation of {aggregate_name} aggregate
+  * Basic CRUD operations implemented
+  * Domain rules and validations added
+
+## Previous Versions
+No previous versions available.
+
+## Migration Notes
+No migration notes for initial version.
+"""
+}
+
+
+def _has_content(path: Path) -> bool:
+    """
+    Whether path exists and is not empty.
+    """
+    try:
+        return path.stat().st_size > 0
+    except OSError:
+        return False
+
+
+def _load_fallback_files(path: Path) -> Set[str]:
+    """
+    Output files that hold fallback pages, as recorded by previous runs.
+    """
+    try:
+        return set(json.loads(path.read_text(encoding='utf-8')))
+    except (OSError, ValueError, TypeError) as e:
+        Logger.debug(f"No fallback record at {path}: {e}")
+        return set()
+
+
+def _save_fallback_files(path: Path, files: List[str]) -> None:
+    """
+    Record the output files that hold fallback pages. Written under a temporary name
+    and moved into place, so an interrupted run never leaves a truncated record.
+    """
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(files), encoding='utf-8')
+        os.replace(tmp_path, path)
+    except OSError as e:
+        Logger.warning(f"Could not write fallback record to {path}: {e}")
+
+
+def _write_if_changed(path: Path, data: bytes) -> None:
+    """
+    Write data to path unless the file already holds exactly those bytes.
+    Keeps re-runs from rewriting (and re-dating) unchanged metadata files.
+    """
+    try:
+        if path.read_bytes() == data:
+            return
+    except OSError:
+        pass
+    path.write_bytes(data)
 
 
 class EnhancedWikiExporterConfig(BaseHandlerConfig):
     output_path: Path = Field(default=Path("Docs"), description="Output path for generated Wiki (Docs/) folder")
     template_path: Path = Field(default=Path(".ai/temp"), description="Path to template files for AI guidance")
+    max_concurrent: int = Field(
+        default=config.DDD_MAX_CONCURRENT,
+        gt=0,
+        validate_default=True,
+        description="Maximum number of aggregates documented concurrently (overrides DDD_MAX_CONCURRENT)",
+    )
+    strict_discovery: bool = Field(
+        default=False,
+        description="Walk all Application folders for aggregates even when a Definitions folder lists them",
+    )
+    refresh_scan_cache: bool = Field(
+        default=False,
+        description="Rescan the repository folders instead of reusing cached aggregate discovery results",
+    )
+    resume: bool = Field(
+        default=False,
+        description="Keep layer files generated by a previous run and only regenerate missing, empty or fallback ones",
+    )
+    skip_missing_layers: bool = Field(
+        default=False,
+        description="Skip the LLM for WebUi/Quality docs of aggregates without a matching controller/test file",
+    )
+    cache_responses: bool = Field(
+        default=False,
+        description="Reuse LLM responses from earlier runs for layers whose prompt has not changed",
+    )
 
 
 class EnhancedWikiExporterHandler(BaseHandler):
@@ -26,6 +245,8 @@ class EnhancedWikiExporterHandler(BaseHandler):
     def __init__(self, config: EnhancedWikiExporterConfig):
         super().__init__(config)
         self.config: EnhancedWikiExporterConfig = config
+        # Date stamp for fallback documents, fixed for the whole run
+        self._today = datetime.now().strftime('%Y-%m-%d')
 
     async def handle(self) -> None:
         """
@@ -33,7 +254,7 @@ class EnhancedWikiExporterHandler(BaseHandler):
         Phase 1: Scan repository and create directory structure with empty .md files
         Phase 2: Fill each .md file with AI-generated content using templates
         """
-        start_time = time.time()
+        start_time = time.monotonic()
         
         print("=" * 80)
         print("🚀 ENHANCED WIKI EXPORTER - Two-Phase Generation")
@@ -54,12 +275,17 @@ class EnhancedWikiExporterHandler(BaseHandler):
 
         # Initialize DDD analyzer
         ddd_config = DDDAnalyzerAgentConfig(
-            repo_path=repo_path
+            repo_path=repo_path,
+            strict_discovery=self.config.strict_discovery,
+            refresh_scan_cache=self.config.refresh_scan_cache,
+            skip_missing_layers=self.config.skip_missing_layers,
+            cache_responses=self.config.cache_responses,
         )
         ddd_analyzer = DDDAnalyzerAgent(ddd_config)
 
-        # Load template files for AI guidance
-        template_files = self._load_template_files()
+        # Load template files for AI guidance. They are only needed in phase 2, so read
+        # them on a worker thread while the repository is scanned
+        template_files_task = asyncio.create_task(asyncio.to_thread(self._load_template_files))
 
         # ============================================================
         # PHASE 1: Structure Creation (No AI)
@@ -73,7 +299,12 @@ class EnhancedWikiExporterHandler(BaseHandler):
         print("🔍 Scanning repository for bounded contexts and aggregates...")
         Logger.info("Analyzing DDD structure...")
         
-        bounded_contexts = await ddd_analyzer.analyze_ddd_structure()
+        try:
+            bounded_contexts = await ddd_analyzer.analyze_ddd_structure()
+        finally:
+            # Collected even when the scan fails, so the load never outlives the handler
+            # and its result or error is not dropped
+            template_files = await template_files_task
 
         if not bounded_contexts:
             Logger.warning("No bounded contexts found!")
@@ -111,7 +342,7 @@ class EnhancedWikiExporterHandler(BaseHandler):
         await self._fill_files_with_ai(ddd_analyzer, bounded_contexts, template_files, out_root)
         
         # Summary
-        elapsed = time.time() - start_time
+        elapsed = time.monotonic() - start_time
         print("\n" + "=" * 80)
         print("✅ DOCUMENTATION GENERATION COMPLETED")
         print("=" * 80)
@@ -146,6 +377,13 @@ class EnhancedWikiExporterHandler(BaseHandler):
         (bc_root / ".order").write_text("\n".join(bc_names))
         
         layer_files = ["Application.md", "ChangeLog.md", "Domain.md", "Infrastructure.md", "Quality.md", "WebUi.md"]
+        layer_names = [(f, f.replace('.md', '')) for f in layer_files]
+        
+        # The layer order is identical for every aggregate, so encode it once
+        layer_order = "\n".join([name for _, name in layer_names]).encode('utf-8')
+        
+        # Collect the small writes first and issue them together below
+        writes: List[Tuple[Path, bytes]] = []
         
         for bc_name, bc_info in bounded_contexts.items():
             bc_dir = bc_root / bc_name
@@ -153,25 +391,36 @@ class EnhancedWikiExporterHandler(BaseHandler):
             
             # Create .order file for bounded context aggregates
             if bc_info.aggregates:
-                (bc_dir / ".order").write_text("\n".join(sorted(bc_info.aggregates)))
+                writes.append((bc_dir / ".order", "\n".join(sorted(bc_info.aggregates)).encode('utf-8')))
+            
+            # Progress lines for this bounded context, written in one go
+            progress_lines = []
             
             for aggregate_name in bc_info.aggregates:
                 agg_dir = bc_dir / aggregate_name
                 agg_dir.mkdir(parents=True, exist_ok=True)
                 
                 # Create .order file for aggregate layers
-                (agg_dir / ".order").write_text("\n".join([f.replace('.md', '') for f in layer_files]))
+                writes.append((agg_dir / ".order", layer_order))
+                
+                # One directory read tells us which layer files already exist
+                existing_files = set(os.listdir(agg_dir))
                 
                 # Create empty .md files
-                for layer_file in layer_files:
+                for layer_file, layer_name in layer_names:
                     file_path = agg_dir / layer_file
-                    if not file_path.exists():
-                        file_path.write_text("", encoding='utf-8')
+                    if layer_file not in existing_files:
+                        writes.append((file_path, b""))
                     
-                    layer_name = layer_file.replace('.md', '')
                     file_paths.append((file_path, bc_name, aggregate_name, layer_name))
                     
-                    print(f"  📄 Created: {bc_name}/{aggregate_name}/{layer_file}")
+                    progress_lines.append(f"  📄 Created: {bc_name}/{aggregate_name}/{layer_file}\n")
+            
+            sys.stdout.write("".join(progress_lines))
+        
+        # Overlap the open/write/close round-trips of the many tiny files
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda item: _write_if_changed(*item), writes))
         
         return file_paths
 
@@ -192,16 +441,29 @@ class EnhancedWikiExporterHandler(BaseHandler):
         failed = 0
         total_aggregates = sum(len(bc.aggregates) for bc in bounded_contexts.values())
         
-        # Semaphore for controlling concurrency (from environment variable)
-        max_concurrent = config.DDD_MAX_CONCURRENT
+        # Semaphore for controlling concurrency (CLI/config file, falling back to DDD_MAX_CONCURRENT)
+        max_concurrent = self.config.max_concurrent
         semaphore = asyncio.Semaphore(max_concurrent)
         
+        # Which output files hold fallback pages is kept next to the scan cache rather than
+        # in the pages themselves, so a resumed run regenerates them
+        fallback_record_path = repo_cache_dir(self.config.repo_path) / "ddd_fallbacks.json"
+        fallback_files = await asyncio.to_thread(_load_fallback_files, fallback_record_path)
+        fallback_record_lock = asyncio.Lock()
+        
+        async def record_fallback_layers(agg_dir, generated_layers, fallback_layers):
+            """Update and store the fallback record after an aggregate's files were written"""
+            fallback_files.difference_update(str(agg_dir / layer_file) for layer_file in generated_layers)
+            fallback_files.update(str(agg_dir / layer_file) for layer_file in fallback_layers)
+            async with fallback_record_lock:
+                await asyncio.to_thread(_save_fallback_files, fallback_record_path, sorted(fallback_files))
+        
         async def process_aggregate_with_semaphore(bc_idx, bc_name, bc_info, agg_idx, aggregate_name):
             """Process a single aggregate with concurrency control"""
             nonlocal processed, failed
             
             async with semaphore:
-                agg_start = time.time()
+                agg_start = time.monotonic()
                 
                 print(f"\n🔄 [{bc_idx}.{agg_idx}] Processing {bc_name}/{aggregate_name}...")
                 Logger.info(f"Generating documentation for {bc_name}/{aggregate_name}")
@@ -209,38 +471,81 @@ class EnhancedWikiExporterHandler(BaseHandler):
                 bc_dir = bc_root / bc_name
                 agg_dir = bc_dir / aggregate_name
                 
+                # Result lines for this aggregate, written in one go once it finishes
+                progress_lines = []
+                
+                # When resuming, layer files already generated by a previous run are kept;
+                # empty files and fallback pages are generated again
+                pending_layers = None
+                if self.config.resume:
+                    pending_layers = {
+                        layer_file for layer_file in FALLBACK_TEMPLATES
+                        if not _has_content(agg_dir / layer_file) or str(agg_dir / layer_file) in fallback_files
+                    }
+                    processed += len(FALLBACK_TEMPLATES) - len(pending_layers)
+                    if not pending_layers:
+                        sys.stdout.write("  ⏭️  Already documented, skipping\n")
+                        return
+                
+                # Layer files written for this aggregate, by whether they hold a generated page
+                generated_layers = set()
+                fallback_layers = set()
+                
                 try:
                     # Generate documentation using AI
                     docs = await ddd_analyzer.generate_aggregate_documentation(
                         bc_name, 
                         aggregate_name,
-                        template_files
+                        template_files,
+                        layers=pending_layers,
                     )
                     
-                    # Write generated content to files
+                    # Write generated content to files off the event loop, all layers at once
+                    await asyncio.gather(*(
+                        asyncio.to_thread((agg_dir / layer_file).write_text, content, encoding='utf-8')
+                        for layer_file, content in docs.items()
+                    ))
+                    fallback_layers = ddd_analyzer.fallback_layers(bc_name, aggregate_name) & docs.keys()
+                    generated_layers = docs.keys() - fallback_layers
+                    
                     for layer_file, content in docs.items():
-                        target_path = agg_dir / layer_file
-                        target_path.write_text(content, encoding='utf-8')
                         processed += 1
                         
                         # Extract first line for preview
-                        preview = content.split('\n')[0][:60] if content else "empty"
-                        print(f"  ✅ {layer_file:20s} ({len(content):5d} chars) - {preview}...")
+                        preview = content.partition('\n')[0][:60] if content else "empty"
+                        progress_lines.append(f"  ✅ {layer_file:20s} ({len(content):5d} chars) - {preview}...\n")
                     
-                    agg_elapsed = time.time() - agg_start
-                    print(f"  ⏱️  Completed in {agg_elapsed:.1f}s ({len(docs)} files)")
+                    agg_elapsed = time.monotonic() - agg_start
+                    progress_lines.append(f"  ⏱️  Completed in {agg_elapsed:.1f}s ({len(docs)} files)\n")
                     
+                except ModelHTTPError:
+                    # The analyzer only lets through errors every other aggregate would hit too
+                    # (e.g. a rejected API key); failing the task group stops the whole run
+                    sys.stdout.write("".join(progress_lines))
+                    raise
                 except Exception as e:
                     Logger.error(f"Error generating docs for {bc_name}/{aggregate_name}: {e}")
-                    print(f"  ❌ Error: {str(e)[:80]}")
+                    progress_lines.append(f"  ❌ Error: {str(e)[:80]}\n")
                     
-                    # Create fallback documentation
-                    self._create_fallback_documentation(agg_dir, bc_name, aggregate_name, template_files)
-                    failed += 6
+                    # Create fallback documentation. A failure here must not escape either:
+                    # it would fail the task group and cancel every other aggregate
+                    fallback_layers = set(pending_layers or FALLBACK_TEMPLATES)
+                    try:
+                        await asyncio.to_thread(
+                            self._create_fallback_documentation,
+                            agg_dir, bc_name, aggregate_name, template_files, pending_layers,
+                        )
+                    except Exception as fallback_error:
+                        Logger.error(f"Error writing fallback docs for {bc_name}/{aggregate_name}: {fallback_error}")
+                        progress_lines.append(f"  ❌ Fallback error: {str(fallback_error)[:80]}\n")
+                    failed += len(fallback_layers)
+                
+                await record_fallback_layers(agg_dir, generated_layers, fallback_layers)
                 
                 # Progress summary
                 progress_pct = (processed + failed) / (total_aggregates * 6) * 100
-                print(f"  📊 Progress: {processed} files processed, {failed // 6} fallbacks, {progress_pct:.1f}% complete")
+                progress_lines.append(f"  📊 Progress: {processed} files processed, {failed} fallback files, {progress_pct:.1f}% complete\n")
+                sys.stdout.write("".join(progress_lines))
         
         # Create tasks for all aggregates
         tasks = []
@@ -253,9 +558,17 @@ class EnhancedWikiExporterHandler(BaseHandler):
                 task = process_aggregate_with_semaphore(bc_idx, bc_name, bc_info, agg_idx, aggregate_name)
                 tasks.append(task)
         
-        # Process all aggregates in parallel with controlled concurrency
+        # Process all aggregates in parallel with controlled concurrency; the task group
+        # cancels in-flight requests if the run is interrupted
         print(f"\n⚡ Processing {len(tasks)} aggregates with max {max_concurrent} concurrent requests...")
-        await asyncio.gather(*tasks)
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                for task in tasks:
+                    task_group.create_task(task)
+        except* ModelHTTPError as group:
+            # Aggregates only let fatal endpoint errors through; every other request would
+            # be rejected as well, so hand the first one to the caller as a plain exception
+            raise group.exceptions[0]
 
     def _load_template_files(self) -> Dict[str, str]:
         """
@@ -297,163 +610,42 @@ class EnhancedWikiExporterHandler(BaseHandler):
         agg_dir: Path, 
         bc_name: str, 
         aggregate_name: str,
-        template_files: Dict[str, str]
+        template_files: Dict[str, str],
+        layers: Optional[Set[str]] = None
     ):
         """
         Create basic fallback documentation when AI generation fails.
+        Only the given layer files are written when layers is set, so pages kept by a
+        resumed run are not overwritten.
         """
         Logger.info(f"Creating fallback documentation for {bc_name}/{aggregate_name}")
         
-        fallback_docs = {
-            "Application.md": f"""# Application Layer – {aggregate_name}
-
-## Commands
-
-### Create{aggregate_name}Command
-- **Purpose**: Creates a new {aggregate_name.lower()}.
-- **Validation**: Validates input parameters.
-- **Handler**: Handles the creation logic.
-
-### Update{aggregate_name}Command
-- **Purpose**: Updates an existing {aggregate_name.lower()}.
-- **Validation**: Validates input parameters and existence.
-- **Handler**: Handles the update logic.
-
-### Delete{aggregate_name}Command
-- **Purpose**: Deletes an existing {aggregate_name.lower()}.
-- **Validation**: Validates existence and constraints.
-- **Handler**: Handles the deletion logic.
-
-## Queries
-
-### Get{aggregate_name}Query
-- **Purpose**: Retrieves {aggregate_name.lower()} information.
-- **Handler**: Handles the query logic.
-- **Return Type**: {aggregate_name}Dto
-""",
-            
-            "Domain.md": f"""# Domain Model – {aggregate_name}
-
-The **{aggregate_name}** entity represents {aggregate_name.lower()} in the {bc_name} bounded context.
-
-### Table And Schema
-```csharp
-[Table("{aggregate_name}s", Schema = "{bc_name}")]
-```
-
-### Entity Definition:
-```csharp
-public class {aggregate_name}
-{{
-    public int {aggregate_name}Id {{ get; set; }}
-    // Additional properties would be defined here
-}}
-```
-
-### RELATIONS
-```csharp
-// Related entities would be listed here
-```
-""",
-            
-            "Infrastructure.md": f"""# Infrastructure: {aggregate_name} Configuration
-
-**Namespace:** `Infrastructure.Persistence.Configurations.{bc_name}`  
-**File:** `{aggregate_name}Configuration.cs`  
-**Database Table:** `[{bc_name}].[{aggregate_name}s]`  
-**Entity:** `Domain.Entity.{bc_name}.{aggregate_name}`  
-
----
-
-| Property | Configuration | Notes |
-|-----------|----------------|-------|
-| `{aggregate_name}Id` | `HasKey()` | Defines the primary key. |
-
-## Repository Implementation
-- **Interface**: I{aggregate_name}Repository
-- **Implementation**: {aggregate_name}Repository
-""",
-            
-            "Quality.md": f"""# Quality & Testing – {aggregate_name}
-
-### Unit Tests
-- **Create{aggregate_name}Command**: Validates input and creation logic.
-- **Update{aggregate_name}Command**: Validates update logic and constraints.
-- **Delete{aggregate_name}Command**: Validates deletion logic and references.
-
-### Performance Tests
-- Verify list queries perform optimally when paging large datasets.
-
-### Observability
-- Log every failure in command validation and database exceptions.
-
-For detailed test cases, see the **Test Cases** section.
-""",
-            
-            "WebUi.md": f"""# {aggregate_name}Controller
-
-**Namespace:** `WebUi.Areas.{bc_name}.Controllers`  
-**Inherits:** `{bc_name}BaseController`  
-**Purpose:** Manage CRUD operations for {bc_name} {aggregate_name} using MediatR.
-
----
-
-## Create {aggregate_name}
-
-**Method:** `POST`  
-**Route:** `/{aggregate_name}/{aggregate_name}_Create`
-
-Creates a new {aggregate_name.lower()}.
-
-## Update {aggregate_name}
-
-**Method:** `PUT`  
-**Route:** `/{aggregate_name}/{aggregate_name}_Edit/{{id}}`
-
-Updates an existing {aggregate_name.lower()}.
-
-## List {aggregate_name}
-
-**Method:** `GET`  
-**Route:** `/{aggregate_name}/{aggregate_name}_List`
-
-Retrieves a list of {aggregate_name.lower()}s.
-""",
-            
-            "ChangeLog.md": f"""# Change History – {aggregate_name}
-
-## Latest Version
-- **Version**: 1.0.0
-- **Date**: {datetime.now().strftime('%Y-%m-%d')}
-- **Changes**:
-  * Initial implementation of {aggregate_name} aggregate
-  * Basic CRUD operations implemented
-  * Domain rules and validations added
-
-## Previous Versions
-No previous versions available.
-
-## Migration Notes
-No migration notes for initial version.
-"""
+        ctx = {
+            "aggregate_name": aggregate_name,
+            "aggregate_lower": aggregate_name.lower(),
+            "bc_name": bc_name,
+            "date": self._today,
         }
         
+        substitutions = {"ContractType": aggregate_name, "HR": bc_name, "Hr": bc_name}
+        
         # Use template content if available, otherwise use fallback
-        for file_name, fallback_content in fallback_docs.items():
+        for file_name, fallback_template in FALLBACK_TEMPLATES.items():
+            if layers is not None and file_name not in layers:
+                continue
             target_path = agg_dir / file_name
             
             # Try to use template content with basic substitutions
-            if file_name in template_files and template_files[file_name]:
+            if template_files.get(file_name):
                 try:
-                    content = template_files[file_name]
-                    # Basic template variable substitution
-                    content = content.replace("ContractType", aggregate_name)
-                    content = content.replace("HR", bc_name)
-                    content = content.replace("Hr", bc_name)
+                    # Substitute all sample names in one pass over the template
+                    content = TEMPLATE_SAMPLE_NAMES.sub(
+                        lambda match: substitutions[match.group()], template_files[file_name]
+                    )
                     target_path.write_text(content, encoding='utf-8')
                 except Exception:
-                    target_path.write_text(fallback_content, encoding='utf-8')
+                    target_path.write_text(fallback_template.format_map(ctx), encoding='utf-8')
             else:
-                target_path.write_text(fallback_content, encoding='utf-8')
+                target_path.write_text(fallback_template.format_map(ctx), encoding='utf-8')
             
             Logger.debug(f"Created fallback {target_path}")
\ No newline at end of file
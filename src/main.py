@@ -13,6 +13,7 @@ import nest_asyncio
 from gitlab import Gitlab
 from pydantic import BaseModel
 from pydantic.fields import FieldInfo
+from pydantic_ai import ModelHTTPError
 from pydantic_core import PydanticUndefinedType
 
 import config
@@ -23,8 +24,6 @@ from handlers.readme import ReadmeHandler, ReadmeHandlerConfig
 from handlers.enhanced_wiki_exporter import EnhancedWikiExporterHandler, EnhancedWikiExporterConfig
 from utils import Logger
 
-nest_asyncio.apply()
-
 
 def configure_logging(
     repo_path: Path,
@@ -87,7 +86,7 @@ async def cronjob_analyze(args: argparse.Namespace):
     await handler.handle()
 
 
-async def export_enhanced_wiki(args: argparse.Namespace):
+async def export_enhanced_wiki(args: argparse.Namespace) -> Optional[int]:
     cfg: EnhancedWikiExporterConfig = load_config(args, EnhancedWikiExporterConfig, "enhanced_wiki_exporter")
     configure_logging(
         repo_path=cfg.repo_path,
@@ -97,7 +96,13 @@ async def export_enhanced_wiki(args: argparse.Namespace):
 
     handler = EnhancedWikiExporterHandler(cfg)
 
-    await handler.handle()
+    try:
+        await handler.handle()
+    except ModelHTTPError as e:
+        # Raised for responses every further request would get too, e.g. a rejected API key
+        Logger.error(f"LLM endpoint rejected the request with status {e.status_code}, stopping")
+        print(f"Error: LLM endpoint rejected the request (status {e.status_code})")
+        return 1
 
 
 def _add_field_arg(handler_group: argparse.ArgumentParser, field_name: str, field_info: FieldInfo):
@@ -219,7 +224,7 @@ async def main() -> Optional[int]:
         case "document":
             await document(args)
         case "ddd":
-            await export_enhanced_wiki(args)
+            return await export_enhanced_wiki(args)
         case "cronjob":
             if args.sub_command == "analyze":
                 await cronjob_analyze(args)
@@ -231,9 +236,25 @@ async def main() -> Optional[int]:
             return 1
 
 
+def _uvloop_factory():
+    """Return uvloop's event loop factory if uvloop is installed, otherwise None."""
+    try:
+        import uvloop
+    except ImportError:
+        return None
+    return uvloop.new_event_loop
+
+
 def cli_main():
     """Entry point for the CLI script."""
-    result = asyncio.run(main())
+    # uvloop is optional: it lowers per-request overhead when many LLM calls are in flight
+    if loop_factory := _uvloop_factory():
+        with asyncio.Runner(loop_factory=loop_factory) as runner:
+            result = runner.run(main())
+    else:
+        # nest_asyncio patches the default asyncio loop only; it does not support uvloop
+        nest_asyncio.apply()
+        result = asyncio.run(main())
     if result is not None:
         sys.exit(result)
 
@@ -1,7 +1,16 @@
 from .dict import merge_dicts
 from .logger import Logger
 from .prompt_manager import PromptManager
+from .rate_limiter import RateLimiter
 from .repo import get_repo_version
-from .retry_client import create_retrying_client
+from .retry_client import create_retrying_client, get_shared_retrying_client
 
-__all__ = ["Logger", "PromptManager", "merge_dicts", "get_repo_version", "create_retrying_client"]
+__all__ = [
+    "Logger",
+    "PromptManager",
+    "merge_dicts",
+    "get_repo_version",
+    "create_retrying_client",
+    "get_shared_retrying_client",
+    "RateLimiter",
+]
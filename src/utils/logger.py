@@ -5,8 +5,11 @@ This module provides a centralized logging system with structured data support,
 multiple handlers, and consistent formatting across all agents.
 """
 
+import atexit
 import logging
+import queue
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from typing import Any, Dict, Optional, Union
 
@@ -23,6 +26,7 @@ class Logger:
     - Configurable log levels
     - Automatic log file naming with timestamps
     - Consistent formatting across all agents
+    - Non-blocking calls: records are queued and written by a background thread
 
     Example:
         ```python
@@ -43,6 +47,7 @@ class Logger:
     """
 
     _logger: logging.Logger = None
+    _listener: QueueListener = None
 
     @classmethod
     def init(
@@ -90,13 +95,19 @@ class Logger:
         file_handler = logging.FileHandler(log_file)
         file_handler.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(message)s"))
         file_handler.setLevel(file_level)
-        cls._logger.addHandler(file_handler)
 
         # Console handler
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(message)s"))
         console_handler.setLevel(console_level)
-        cls._logger.addHandler(console_handler)
+
+        # File and console writes happen on a listener thread so logging from
+        # coroutines only enqueues a record instead of blocking the event loop
+        log_queue = queue.SimpleQueue()
+        cls._logger.addHandler(QueueHandler(log_queue))
+        cls._listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+        cls._listener.start()
+        atexit.register(cls._listener.stop)
 
         # Log initial message to verify setup
         cls._logger.debug(f"Logger initialized with log file: {log_file}")
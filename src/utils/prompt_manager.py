@@ -1,10 +1,27 @@
 from copy import copy
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, Optional, Union
 
 import jinja2
 import yaml
 
+# libyaml's C loader is several times faster than the pure-Python one when available
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Compiled templates, shared by all PromptManager instances
+_TEMPLATE_CACHE: Dict[str, jinja2.Template] = {}
+
+
+@lru_cache(maxsize=32)
+def _load_prompt_file(file_path: Path) -> Any:
+    """Parse a prompt YAML file once per process."""
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return yaml.load(f, Loader=_YAML_LOADER)
+    except yaml.YAMLError as e:
+        raise yaml.YAMLError(f"Failed to parse YAML file {file_path}: {e}")
+
 
 class PromptManager:
     """Manages loading and rendering of prompts from YAML files."""
@@ -25,17 +42,13 @@ class PromptManager:
         if not file_path.exists():
             raise FileNotFoundError(f"Prompt file not found: {file_path}")
 
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                self._prompt_data = yaml.safe_load(f)
-        except yaml.YAMLError as e:
-            raise yaml.YAMLError(f"Failed to parse YAML file {file_path}: {e}")
+        self._prompt_data = _load_prompt_file(file_path.resolve())
 
         if section_path:
             self._prompt_data = self._traverse_path(self._prompt_data, section_path)
 
         # Cache for rendered templates
-        self._template_cache: Dict[str, jinja2.Template] = {}
+        self._template_cache = _TEMPLATE_CACHE
 
     def _traverse_path(self, data: Any, path: str) -> Any:
         current = data
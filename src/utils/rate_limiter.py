@@ -0,0 +1,62 @@
+"""
+Client-side Rate Limiter
+
+This module provides a token bucket that paces outgoing requests to an API.
+
+What it does:
+- Allows a fixed number of requests per minute
+- Lets a small burst through immediately, then spaces requests out evenly
+- Makes callers wait (without blocking the event loop) until a request slot is free
+
+Pacing requests before they are sent avoids hitting provider rate limits (429)
+and spending concurrency slots on retries that were bound to fail.
+"""
+
+import asyncio
+import time
+
+
+class RateLimiter:
+    """
+    Token bucket limiting how many requests are started per minute.
+
+    Example:
+        ```python
+        limiter = RateLimiter(requests_per_minute=120)
+        await limiter.acquire()  # waits until a request may be sent
+        ```
+    """
+
+    def __init__(self, requests_per_minute: float, burst: int = 1) -> None:
+        """
+        Args:
+            requests_per_minute: Sustained number of requests allowed per minute
+            burst: Number of requests that may be sent back-to-back when the bucket is full
+        """
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+
+        self._rate = requests_per_minute / 60.0
+        self._capacity = float(max(1, burst))
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """
+        Wait until a request slot is available and take it.
+
+        Each caller reserves its slot while holding the lock and sleeps after releasing it,
+        so concurrent callers wait side by side instead of queueing behind one sleeper.
+        """
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+
+            # Take the slot right away; a negative balance is how far in the future it frees up
+            self._tokens -= 1
+            wait = -self._tokens / self._rate
+
+        if wait > 0:
+            await asyncio.sleep(wait)
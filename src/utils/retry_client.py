@@ -14,15 +14,48 @@ What it does:
 This is useful when calling APIs that might be temporarily unavailable.
 """
 
-from httpx import AsyncClient, HTTPStatusError
+from functools import lru_cache
+from typing import Optional
+
+from httpx import AsyncBaseTransport, AsyncClient, AsyncHTTPTransport, HTTPStatusError, Limits, Request, Response
 from pydantic_ai.retries import AsyncTenacityTransport, RetryConfig, wait_retry_after
 from tenacity import retry_if_exception_type, stop_after_attempt, wait_exponential
 
+from .rate_limiter import RateLimiter
+
+# Connection pool of each client. httpx keeps only 20 idle connections by default, fewer
+# than the concurrent LLM requests of a wiki export (DDD_MAX_CONCURRENT aggregates x 6
+# layers), so every request beyond those would pay for a fresh TCP + TLS handshake
+CONNECTION_LIMITS = Limits(max_connections=100, max_keepalive_connections=100, keepalive_expiry=30.0)
+
+
+class _RateLimitedTransport(AsyncBaseTransport):
+    """
+    Transport that waits for a rate limiter slot before every request it sends.
+
+    It sits below the retrying transport, so each retried attempt (including those
+    after a 429) takes a slot of its own.
+    """
+
+    def __init__(self, wrapped: AsyncBaseTransport, rate_limiter: RateLimiter) -> None:
+        self._wrapped = wrapped
+        self._rate_limiter = rate_limiter
+
+    async def handle_async_request(self, request: Request) -> Response:
+        await self._rate_limiter.acquire()
+        return await self._wrapped.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._wrapped.aclose()
+
 
-def create_retrying_client() -> AsyncClient:
+def create_retrying_client(rate_limiter: Optional[RateLimiter] = None) -> AsyncClient:
     """
     Create an HTTP client that automatically retries failed requests.
 
+    Args:
+        rate_limiter: Optional limiter every request, retries included, waits on before it is sent
+
     Returns:
         AsyncClient: An HTTP client configured with retry logic that will:
         - Retry on server errors (429, 502, 503, 504) and connection issues
@@ -54,6 +87,13 @@ def create_retrying_client() -> AsyncClient:
         if response.status_code in (429, 502, 503, 504):
             response.raise_for_status()  # This will raise HTTPStatusError for retry
 
+    # The underlying transport keeps connections alive between requests; with a rate limiter,
+    # every attempt the retry logic makes is paced up front so it doesn't run into the
+    # provider's rate limit
+    wrapped_transport: AsyncBaseTransport = AsyncHTTPTransport(limits=CONNECTION_LIMITS)
+    if rate_limiter is not None:
+        wrapped_transport = _RateLimitedTransport(wrapped_transport, rate_limiter)
+
     # Create the transport layer with retry logic
     transport = AsyncTenacityTransport(
         config=RetryConfig(
@@ -76,6 +116,24 @@ def create_retrying_client() -> AsyncClient:
         ),
         # Function to check if response status should trigger a retry:
         validate_response=should_retry_status,
+        # The underlying transport that sends each attempt:
+        wrapped=wrapped_transport,
     )
+
     # Return the configured HTTP client
     return AsyncClient(transport=transport)
+
+
+@lru_cache(maxsize=1)
+def get_shared_retrying_client() -> AsyncClient:
+    """
+    Get the process-wide retrying HTTP client.
+
+    Agents talking to the LLM endpoints share this client, so connections (and their
+    TLS sessions) are pooled across agents and across repeated runs, e.g. one analyzer
+    per project in the cronjob.
+
+    Returns:
+        AsyncClient: The shared client, created by create_retrying_client() on first use
+    """
+    return create_retrying_client()
@@ -0,0 +1,25 @@
+import os
+
+import pytest
+
+# config reads these at import time; the tests never talk to a real endpoint
+for name in ("ANALYZER", "DOCUMENTER"):
+    os.environ.setdefault(f"{name}_LLM_MODEL", "test-model")
+    os.environ.setdefault(f"{name}_LLM_BASE_URL", "http://localhost")
+    os.environ.setdefault(f"{name}_LLM_API_KEY", "test-key")
+
+import config  # noqa: E402
+from utils import Logger  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def logger(tmp_path_factory):
+    Logger.init(tmp_path_factory.mktemp("logs"))
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Keeps the DDD caches of every test out of the real per-user cache"""
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(config, "DDD_CACHE_DIR", cache_dir)
+    return cache_dir
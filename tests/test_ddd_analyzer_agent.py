@@ -0,0 +1,88 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+import ujson as json
+
+from agents.ddd_analyzer_agent import SCAN_CACHE_VERSION, DDDAnalyzerAgent, DDDAnalyzerAgentConfig
+
+
+@pytest.fixture
+def repo_path(tmp_path):
+    repo_path = tmp_path / "repo"
+    (repo_path / "Application" / "HR" / "Definitions" / "ContractType").mkdir(parents=True)
+    return repo_path
+
+
+def _aggregates(repo_path):
+    agent = DDDAnalyzerAgent(DDDAnalyzerAgentConfig(repo_path=repo_path))
+    bounded_contexts = asyncio.run(agent.analyze_ddd_structure())
+    return {name: context.aggregates for name, context in bounded_contexts.items()}
+
+
+def test_scan_cache_is_stored_outside_the_repository(cache_dir, repo_path):
+    assert _aggregates(repo_path) == {"HR": ["ContractType"]}
+
+    assert not (repo_path / ".ai").exists()
+    [cache_file] = cache_dir.glob("repo-*/ddd_scan.json")
+    assert json.loads(cache_file.read_text())["version"] == SCAN_CACHE_VERSION
+
+
+def test_scan_cache_from_another_version_is_discarded(cache_dir, repo_path):
+    _aggregates(repo_path)
+    [cache_file] = cache_dir.glob("repo-*/ddd_scan.json")
+    stored = json.loads(cache_file.read_text())
+    stored["version"] = SCAN_CACHE_VERSION - 1
+    stored["contexts"]["HR"]["aggregates"] = ["Stale"]
+    cache_file.write_text(json.dumps(stored))
+
+    assert _aggregates(repo_path) == {"HR": ["ContractType"]}
+
+
+class FakeLayerAgent:
+    """Stands in for a pydantic-ai Agent, answering every prompt with the same page."""
+
+    def __init__(self):
+        self.runs = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+    async def run(self, user_prompt, output_type):
+        self.runs += 1
+        return SimpleNamespace(output="# Domain Model – ContractType\n")
+
+
+def test_cached_responses_are_stored_outside_the_repository(cache_dir, repo_path):
+    agent = DDDAnalyzerAgent(DDDAnalyzerAgentConfig(repo_path=repo_path, cache_responses=True))
+    layer_agent = FakeLayerAgent()
+
+    for _ in range(2):
+        content = asyncio.run(
+            agent._generate_layer_documentation(layer_agent, "Domain.md", "HR", "ContractType", {}, "")
+        )
+
+    assert content == "# Domain Model – ContractType\n"
+    assert layer_agent.runs == 1
+    assert not (repo_path / ".ai").exists()
+    assert len(list(cache_dir.glob("repo-*/ddd_responses/*.md"))) == 1
+
+
+class FailingLayerAgent(FakeLayerAgent):
+    async def run(self, user_prompt, output_type):
+        raise RuntimeError("model unavailable")
+
+
+def test_failed_layers_are_reported_as_fallbacks(repo_path):
+    agent = DDDAnalyzerAgent(DDDAnalyzerAgentConfig(repo_path=repo_path))
+
+    content = asyncio.run(
+        agent._generate_layer_documentation(FailingLayerAgent(), "Domain.md", "HR", "ContractType", {}, "")
+    )
+
+    assert content.startswith("# Domain Model – ContractType")
+    assert agent.fallback_layers("HR", "ContractType") == {"Domain.md"}
+    assert agent.fallback_layers("HR", "Employee") == set()
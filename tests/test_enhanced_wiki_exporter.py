@@ -0,0 +1,168 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+from pydantic_ai import ModelHTTPError
+
+import main
+from agents.ddd_analyzer_agent import BoundedContext, DDDAnalyzerAgent
+from config import load_config
+from handlers.enhanced_wiki_exporter import (
+    FALLBACK_TEMPLATES,
+    EnhancedWikiExporterConfig,
+    EnhancedWikiExporterHandler,
+)
+
+
+class FakeAnalyzer:
+    """Stands in for DDDAnalyzerAgent, answering every layer with a fixed page."""
+
+    def __init__(self, error: Exception = None, fallbacks=()):
+        self.error = error
+        self.fallbacks = set(fallbacks)
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate_aggregate_documentation(self, context_name, aggregate_name, template_files, layers=None):
+        self.calls.append((context_name, aggregate_name, layers))
+        if self.error is not None:
+            raise self.error
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return {
+            layer_file: "placeholder\n" if layer_file in self.fallbacks else f"# {layer_file} – {aggregate_name}\n"
+            for layer_file in (layers if layers is not None else FALLBACK_TEMPLATES)
+        }
+
+    def fallback_layers(self, context_name, aggregate_name):
+        return set(self.fallbacks)
+
+
+def _bounded_contexts(repo_path: Path, aggregates):
+    return {"HR": BoundedContext(name="HR", path=repo_path / "Application" / "HR", aggregates=aggregates)}
+
+
+def _fill(handler, analyzer, bounded_contexts, out_root):
+    handler._create_directory_structure(out_root, bounded_contexts)
+    asyncio.run(handler._fill_files_with_ai(analyzer, bounded_contexts, {}, out_root))
+
+
+def test_rejected_request_is_raised_as_a_single_model_http_error(tmp_path):
+    handler = EnhancedWikiExporterHandler(EnhancedWikiExporterConfig(repo_path=tmp_path))
+    analyzer = FakeAnalyzer(error=ModelHTTPError(status_code=401, model_name="test-model", body="bad key"))
+
+    with pytest.raises(ModelHTTPError) as exc_info:
+        _fill(handler, analyzer, _bounded_contexts(tmp_path, ["ContractType", "Employee"]), tmp_path / "Docs")
+
+    assert exc_info.value.status_code == 401
+
+
+def _load_cli_config(monkeypatch, *argv):
+    monkeypatch.setattr("sys.argv", ["ai-doc-gen", "ddd", *argv])
+    return load_config(main.parse_args(), EnhancedWikiExporterConfig, "enhanced_wiki_exporter")
+
+
+def test_max_concurrent_from_cli_limits_aggregates_in_flight(tmp_path, monkeypatch):
+    cfg = _load_cli_config(monkeypatch, "--repo-path", str(tmp_path), "--max-concurrent", "2")
+    analyzer = FakeAnalyzer()
+
+    _fill(
+        EnhancedWikiExporterHandler(cfg),
+        analyzer,
+        _bounded_contexts(tmp_path, [f"Aggregate{i}" for i in range(6)]),
+        tmp_path / "Docs",
+    )
+
+    assert cfg.max_concurrent == 2
+    assert len(analyzer.calls) == 6
+    assert analyzer.max_in_flight == 2
+
+
+@pytest.mark.parametrize("value", ["0", "-1"])
+def test_max_concurrent_must_be_positive(tmp_path, monkeypatch, value):
+    with pytest.raises(ValidationError):
+        _load_cli_config(monkeypatch, "--repo-path", str(tmp_path), "--max-concurrent", value)
+
+
+def test_resume_regenerates_only_fallback_and_empty_pages(tmp_path):
+    out_root = tmp_path / "Docs"
+    bounded_contexts = _bounded_contexts(tmp_path, ["ContractType", "Employee"])
+    agg_dir = out_root / "BoundedContext" / "HR"
+    _fill(
+        EnhancedWikiExporterHandler(EnhancedWikiExporterConfig(repo_path=tmp_path)),
+        FakeAnalyzer(fallbacks={"WebUi.md"}),
+        bounded_contexts,
+        out_root,
+    )
+    (agg_dir / "Employee" / "Domain.md").write_text("")
+
+    analyzer = FakeAnalyzer()
+    _fill(
+        EnhancedWikiExporterHandler(EnhancedWikiExporterConfig(repo_path=tmp_path, resume=True)),
+        analyzer,
+        bounded_contexts,
+        out_root,
+    )
+
+    assert sorted(analyzer.calls) == [
+        ("HR", "ContractType", {"WebUi.md"}),
+        ("HR", "Employee", {"Domain.md", "WebUi.md"}),
+    ]
+    # Published pages carry no bookkeeping, and regenerated fallbacks are no longer pending
+    assert (agg_dir / "ContractType" / "WebUi.md").read_text() == "# WebUi.md – ContractType\n"
+    analyzer = FakeAnalyzer()
+    _fill(
+        EnhancedWikiExporterHandler(EnhancedWikiExporterConfig(repo_path=tmp_path, resume=True)),
+        analyzer,
+        bounded_contexts,
+        out_root,
+    )
+    assert analyzer.calls == []
+
+
+def test_aggregate_failure_writes_fallbacks_only_for_pending_layers(tmp_path):
+    out_root = tmp_path / "Docs"
+    bounded_contexts = _bounded_contexts(tmp_path, ["ContractType"])
+    agg_dir = out_root / "BoundedContext" / "HR" / "ContractType"
+    _fill(
+        EnhancedWikiExporterHandler(EnhancedWikiExporterConfig(repo_path=tmp_path)),
+        FakeAnalyzer(),
+        bounded_contexts,
+        out_root,
+    )
+    (agg_dir / "Quality.md").write_text("")
+
+    handler = EnhancedWikiExporterHandler(EnhancedWikiExporterConfig(repo_path=tmp_path, resume=True))
+    _fill(handler, FakeAnalyzer(error=RuntimeError("boom")), bounded_contexts, out_root)
+
+    assert (agg_dir / "Domain.md").read_text() == "# Domain.md – ContractType\n"
+    assert (agg_dir / "Quality.md").read_text().startswith("# Quality & Testing – ContractType")
+
+    analyzer = FakeAnalyzer()
+    _fill(handler, analyzer, bounded_contexts, out_root)
+    assert analyzer.calls == [("HR", "ContractType", {"Quality.md"})]
+
+
+@pytest.mark.parametrize("scan_error", [None, OSError("scan failed")])
+def test_template_load_is_collected_when_phase_one_stops(tmp_path, monkeypatch, scan_error):
+    async def analyze_ddd_structure(self):
+        if scan_error is not None:
+            raise scan_error
+        return {}
+
+    monkeypatch.setattr(DDDAnalyzerAgent, "analyze_ddd_structure", analyze_ddd_structure)
+    handler = EnhancedWikiExporterHandler(EnhancedWikiExporterConfig(repo_path=tmp_path))
+    loaded = []
+    monkeypatch.setattr(handler, "_load_template_files", lambda: loaded.append(True) or {})
+
+    if scan_error is None:
+        asyncio.run(handler.handle())
+    else:
+        with pytest.raises(OSError):
+            asyncio.run(handler.handle())
+
+    assert loaded == [True]
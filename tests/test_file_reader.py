@@ -0,0 +1,27 @@
+import locale
+
+import pytest
+from pydantic_ai import ModelRetry
+
+from agents.tools.file_tool.file_reader import FileReadTool
+
+
+def test_reads_the_requested_lines(tmp_path):
+    source = tmp_path / "ContractType.cs"
+    source.write_text("".join(f"line {i}\n" for i in range(10)))
+
+    output = FileReadTool(repo_path=tmp_path)._run("ContractType.cs", line_number=2, line_count=3)
+
+    assert output == "File Line:2 to 5 from: 10\n--- start---\nline 2\nline 3\nline 4\n\n--- end ---\n"
+
+
+@pytest.mark.skipif(
+    locale.getpreferredencoding(False).lower().replace("-", "") != "utf8",
+    reason="files are decoded with the platform encoding",
+)
+def test_undecodable_file_is_reported_instead_of_mangled(tmp_path):
+    # Legacy .NET sources are often saved as UTF-16
+    (tmp_path / "Legacy.cs").write_bytes("namespace Legacy.Ünïcode;\n".encode("utf-16"))
+
+    with pytest.raises(ModelRetry, match="Failed to read file"):
+        FileReadTool(repo_path=tmp_path)._run("Legacy.cs")
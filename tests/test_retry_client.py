@@ -0,0 +1,52 @@
+import asyncio
+import time
+
+import httpx
+
+import config
+from utils import RateLimiter, retry_client
+
+
+def test_rate_limit_covers_retried_attempts(monkeypatch):
+    monkeypatch.setattr(config, "DDD_REQUESTS_PER_MINUTE", 1200)
+    attempts = []
+
+    def handler(request):
+        attempts.append((time.monotonic(), request.url.path))
+        # Every request is rejected once, asking to be retried right away
+        if sum(path == request.url.path for _, path in attempts) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200)
+
+    monkeypatch.setattr(retry_client, "AsyncHTTPTransport", lambda **kwargs: httpx.MockTransport(handler))
+    client = retry_client.create_retrying_client(RateLimiter(config.DDD_REQUESTS_PER_MINUTE))
+
+    async def send_all():
+        async with client:
+            return await asyncio.gather(*(client.get(f"http://llm.test/{i}") for i in range(4)))
+
+    responses = asyncio.run(send_all())
+
+    assert [response.status_code for response in responses] == [200] * 4
+    assert len(attempts) == 8
+    # However attempts are grouped, a window of any length holds at most the burst of one
+    # plus what the rate allows in that time
+    rate = config.DDD_REQUESTS_PER_MINUTE / 60
+    times = sorted(sent_at for sent_at, _ in attempts)
+    for first in range(len(times)):
+        for last in range(first + 1, len(times)):
+            assert last - first + 1 <= 1 + rate * (times[last] - times[first]) + 0.1
+
+
+def test_waiting_callers_get_consecutive_slots():
+    limiter = RateLimiter(requests_per_minute=600)
+
+    async def acquire_all():
+        await limiter.acquire()  # empties the bucket
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.acquire() for _ in range(3)))
+        return time.monotonic() - start
+
+    # The three callers get the next three slots, 0.1s apart, and none waits longer than that
+    elapsed = asyncio.run(acquire_all())
+    assert 0.28 <= elapsed < 0.45